@@ -1,13 +1,14 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, date
 from typing import List
 
 # Import Habit Engine components
 # Assumes src is in the python path
 from src.domain.schemas import DailyBehavior
-from src.processing.features import FeatureEngineer
+from src.processing.features import FeatureEngineer, extend_miss_run
 from src.models.adherence import AdherenceModel
 from src.models.burnout import BurnoutRiskModel
 from src.processing.recommender import RecommendationEngine
@@ -39,55 +40,47 @@ mean_sleep = st.sidebar.slider("Avg Sleep (Hours)", 4.0, 10.0, 7.5)
 sleep_volatility = st.sidebar.slider("Sleep Volatility", 0.1, 1.0, 0.2)
 
 # --- DATA GENERATION FUNCTION ---
+# Single generator for the whole session; batched draws are much cheaper
+# than per-day scalar calls to the legacy np.random.* API.
+_rng = np.random.default_rng()
+
 def generate_history(
-    days: int, 
+    days: int,
     avg_steps: int, steps_vol: float,
     ex_freq: int, ex_dur: int,
     avg_sleep_h: float, sleep_vol: float
 ) -> List[DailyBehavior]:
-    
-    data = []
+
     end_date = datetime.now().date()
     start_date = end_date - timedelta(days=days)
-    
+
     # Probabilities
     ex_prob = ex_freq / 7.0
-    
-    for i in range(days):
-        current_date = start_date + timedelta(days=i)
-        
-        # Steps
-        # Use lognormal to avoid negative steps and simulate real distribution
-        steps = int(np.random.normal(avg_steps, avg_steps * steps_vol))
-        steps = max(0, steps)
-        
-        # Exercise
-        if np.random.random() < ex_prob:
-            ex_done = True
-            ex_mins = max(10, int(np.random.normal(ex_dur, ex_dur * 0.2)))
-        else:
-            ex_done = False
-            ex_mins = 0
-            
-        # Sleep
-        sleep_mins = max(0, int(np.random.normal(avg_sleep_h * 60, avg_sleep_h * 60 * sleep_vol)))
-        
-        # Create Object
-        # Note: We are mocking the "Aggregated" state directly, skipping raw events
-        record = DailyBehavior(
-            date=current_date,
-            total_steps=steps,
-            exercise_minutes=ex_mins,
-            exercise_done=ex_done,
-            sleep_duration_minutes=sleep_mins,
-            # Timestamps are optional in aggregations if we just analyze totals
+
+    # Draw every signal for the whole history in one vectorized batch
+    steps = np.clip(_rng.normal(avg_steps, avg_steps * steps_vol, days), 0, None).astype(np.int32)
+    ex_done = _rng.binomial(1, ex_prob, size=days).astype(bool)
+    ex_mins = np.where(ex_done, np.maximum(10, _rng.normal(ex_dur, ex_dur * 0.2, days)).astype(int), 0)
+    sleep_mins = np.clip(_rng.normal(avg_sleep_h * 60, avg_sleep_h * 60 * sleep_vol, days), 0, None).astype(int)
+    dates = pd.date_range(start=start_date, periods=days, freq='D').date
+
+    # Note: We are mocking the "Aggregated" state directly, skipping raw events
+    # Timestamps are optional in aggregations if we just analyze totals
+    # model_construct skips pydantic validation — safe here because the
+    # arrays above are already the right types.
+    return [
+        DailyBehavior.model_construct(
+            date=d,
+            total_steps=int(s),
+            exercise_minutes=int(m),
+            exercise_done=bool(e),
+            sleep_duration_minutes=int(sl),
             sleep_start_time=None,
             sleep_end_time=None,
             exercise_start_time=None
         )
-        data.append(record)
-        
-    return data
+        for d, s, m, e, sl in zip(dates, steps, ex_mins, ex_done, sleep_mins)
+    ]
 
 # --- MAIN APP FLOW ---
 
@@ -106,15 +99,15 @@ if st.button("Regenerate Data from Settings") or st.session_state.history_df is
             exercise_freq, mean_exercise_duration, 
             mean_sleep, sleep_volatility
         )
-        st.session_state.history_df = pd.DataFrame([d.model_dump() for d in _generated_data])
+        # Column-wise (SoA) build: one list per field instead of one dict per record
+        st.session_state.history_df = pd.DataFrame({
+            name: [getattr(d, name) for d in _generated_data]
+            for name in DailyBehavior.model_fields
+        })
 
 st.markdown("### User History (Editable)")
 st.info("You can edit the values below directly to test different scenarios (e.g., adding a 14-day gap).")
 
-def clean_nan(val):
-    if pd.isna(val): return None
-    return val
-
 # Interactive Editor
 edited_df = st.data_editor(
     st.session_state.history_df,
@@ -136,39 +129,104 @@ history_data = []
 # Sort by date to ensure features calculate correctly
 if not edited_df.empty:
     if 'date' in edited_df.columns:
-        edited_df['date'] = pd.to_datetime(edited_df['date'])
-        edited_df = edited_df.sort_values('date')
-
-for _, row in edited_df.iterrows():
-    # Date handling
-    d_val = row['date']
-    if isinstance(d_val, pd.Timestamp):
-        d_val = d_val.date()
-    elif isinstance(d_val, str):
-        try:
-            d_val = datetime.strptime(d_val, "%Y-%m-%d").date()
-        except:
-            d_val = datetime.now().date() # Fallback
-
-    record = DailyBehavior(
-        date=d_val,
-        total_steps=int(row['total_steps']),
-        exercise_minutes=int(row['exercise_minutes']),
-        exercise_done=bool(row['exercise_done']),
-        sleep_duration_minutes=int(row['sleep_duration_minutes']),
-        sleep_start_time=clean_nan(row.get('sleep_start_time')),
-        sleep_end_time=clean_nan(row.get('sleep_end_time')),
-        exercise_start_time=clean_nan(row.get('exercise_start_time'))
-    )
-    history_data.append(record)
+        # Coerce unparseable entries, falling back to today like the old row loop did
+        edited_df['date'] = pd.to_datetime(edited_df['date'], errors='coerce')
+        edited_df['date'] = edited_df['date'].fillna(pd.Timestamp(datetime.now().date()))
+        # Generated history is already chronological; only pay for the sort
+        # when an edit actually broke the order.
+        if not edited_df['date'].is_monotonic_increasing:
+            edited_df = edited_df.sort_values('date')
+
+    # Columnar conversion: coerce dtypes once instead of per-row iterrows checks
+    dates = edited_df['date'].dt.date.to_numpy()
+    steps = edited_df['total_steps'].fillna(0).astype(np.int32).to_numpy()
+    ex_mins = edited_df['exercise_minutes'].fillna(0).astype(np.int32).to_numpy()
+    ex_done = edited_df['exercise_done'].fillna(False).astype(bool).to_numpy()
+    sleep = edited_df['sleep_duration_minutes'].fillna(0).astype(np.int32).to_numpy()
+
+    def optional_col(name):
+        # Editor may drop optional timestamp columns; NaN becomes None for pydantic
+        if name in edited_df.columns:
+            col = edited_df[name]
+            return col.where(col.notna(), None).to_numpy(dtype=object)
+        return np.full(len(edited_df), None, dtype=object)
+
+    sleep_starts = optional_col('sleep_start_time')
+    sleep_ends = optional_col('sleep_end_time')
+    ex_starts = optional_col('exercise_start_time')
+
+    # Dtypes were coerced column-wise above, so validation can be skipped here too
+    history_data = [
+        DailyBehavior.model_construct(
+            date=d,
+            total_steps=int(s),
+            exercise_minutes=int(m),
+            exercise_done=bool(e),
+            sleep_duration_minutes=int(sl),
+            sleep_start_time=ss,
+            sleep_end_time=se,
+            exercise_start_time=es
+        )
+        for d, s, m, e, sl, ss, se, es in zip(
+            dates, steps, ex_mins, ex_done, sleep, sleep_starts, sleep_ends, ex_starts
+        )
+    ]
 
 st.caption(f"Processing {len(history_data)} days of history.")
 
+# --- CACHED PIPELINE STAGES ---
+# Streamlit reruns this whole script on every widget interaction, so we key the
+# heavy stages on a cheap hashable fingerprint of the history. Unless the user
+# actually edits the data, feature engineering and model training are skipped.
+history_fingerprint = tuple(
+    (d.date, d.total_steps, d.exercise_minutes, d.exercise_done, d.sleep_duration_minutes)
+    for d in history_data
+)
+
+# Stateless components: construct once per process, not once per rerun
+@st.cache_resource
+def get_engineer():
+    return FeatureEngineer()
+
+@st.cache_resource
+def get_recommender():
+    return RecommendationEngine()
+
+@st.cache_data(show_spinner=False)
+def compute_features(_history, fingerprint):
+    df = get_engineer().enhance(_history)
+    # Downcast the wide raw columns (default int64/float64 are 8 bytes each);
+    # daily step/minute counts fit comfortably in 2-4 bytes.
+    return df.astype({
+        'total_steps': 'int32',
+        'sleep_duration_minutes': 'int16',
+        'exercise_minutes': 'int16',
+        'exercise_done': 'bool',
+    })
+
+def _safe_train(model, df):
+    # Capture per-model failures so one bad fit doesn't hide the other's result
+    try:
+        return model.train(df), None
+    except Exception as e:
+        return {}, e
+
+@st.cache_resource(show_spinner=False)
+def train_models(_df, fingerprint):
+    # The two fits are independent reads of the feature frame, and sklearn /
+    # lifelines release the GIL in their numeric cores — train them together.
+    adherence = AdherenceModel()
+    burnout = BurnoutRiskModel(dropout_threshold_days=7)
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        f_adh = pool.submit(_safe_train, adherence, _df)
+        f_burn = pool.submit(_safe_train, burnout, _df)
+        return adherence, f_adh.result(), burnout, f_burn.result()
+
 # 2. Feature Engineering
 st.header("2. Feature Engineering")
-engineer = FeatureEngineer()
+engineer = get_engineer()
 with st.spinner("Calculating behavioral signals (rolling averages, trends, consistency)..."):
-    df_features = engineer.enhance(history_data)
+    df_features = compute_features(history_data, history_fingerprint)
     
     # Display some interesting features
     cols = ['total_steps', 'sleep_duration_minutes', 'exercise_done']
@@ -176,22 +234,23 @@ with st.spinner("Calculating behavioral signals (rolling averages, trends, consi
     generated_cols = [c for c in df_features.columns if c not in cols and c != 'date']
     display_cols = cols + generated_cols[:3] # Show a few generated ones
     
-    st.dataframe(df_features[display_cols].tail(5))
-    
-    # Simple Chart
-    st.line_chart(df_features[['total_steps', 'sleep_duration_minutes']])
+    # Take the 5-row tail first so only that slice gets projected
+    st.dataframe(df_features.tail(5)[display_cols])
+
+    # Simple Chart — let Streamlit project the columns instead of copying them
+    st.line_chart(df_features, y=['total_steps', 'sleep_duration_minutes'])
 
 # 3. Model Training
 st.header("3. Model Training")
 
+adherence_model, (metrics_adh, adh_error), burnout_model, (metrics_burn, burn_error) = \
+    train_models(df_features, history_fingerprint)
+
 col1, col2 = st.columns(2)
 
 with col1:
     st.subheader("Adherence Model")
-    adherence_model = AdherenceModel()
-    try:
-        metrics_adh = adherence_model.train(df_features)
-        
+    if adh_error is None:
         st.metric("Model Accuracy", f"{metrics_adh.get('accuracy', 0):.2f}")
         st.metric("AUC Score", f"{metrics_adh.get('auc', 0):.2f}")
         
@@ -200,18 +259,14 @@ with col1:
             st.write("Top Factors:")
             fi = pd.DataFrame(list(metrics_adh['feature_importance'].items()), columns=['Feature', 'Weight'])
             st.dataframe(fi.sort_values('Weight', ascending=False).head(5), hide_index=True)
-            
-    except Exception as e:
-        metrics_adh = {}
-        st.warning(f"Adherence Model Training Failed: {e}")
+
+    else:
+        st.warning(f"Adherence Model Training Failed: {adh_error}")
         st.caption("Ensure your history has both exercise days and rest days (variation needed for Logistic Regression).")
 
 with col2:
     st.subheader("Burnout Risk Model")
-    burnout_model = BurnoutRiskModel(dropout_threshold_days=7)
-    try:
-        metrics_burn = burnout_model.train(df_features)
-        
+    if burn_error is None:
         status = metrics_burn.get('status')
         if status == 'success':
             st.success("Training Successful")
@@ -224,10 +279,10 @@ with col2:
         else:
             st.warning(f"Training Issue: {metrics_burn.get('message')}")
             st.caption("Try increasing history length or volatility to generate more 'dropout' events.")
-            
-    except Exception as e:
+
+    else:
         metrics_burn = {"status": "error"}
-        st.error(f"Burnout Model Critical Fail: {e}")
+        st.error(f"Burnout Model Critical Fail: {burn_error}")
 
 # 4. Interactive Calculator
 st.header("4. Interactive Prediction")
@@ -244,38 +299,50 @@ with input_col3:
     today_ex_done = today_ex_mins > 0
 
 if st.button("Analyze Today"):
-    # Create the "Today" record
+    # Create the "Today" record — reused across reruns while inputs are unchanged
     today = datetime.now().date()
-    today_record = DailyBehavior(
-        date=today,
-        total_steps=today_steps,
-        exercise_minutes=today_ex_mins,
-        exercise_done=today_ex_done,
-        sleep_duration_minutes=today_sleep * 60,
-    )
-    
-    # We need to append this to history to calculate features (rolling windows need context)
-    # Be careful not to duplicate if we re-run
-    full_history = history_data + [today_record]
-    
-    # Re-run features
-    df_full = engineer.enhance(full_history)
+    today_key = (today, today_steps, today_sleep, today_ex_mins)
+    if st.session_state.get('today_key') != today_key:
+        st.session_state['today_record'] = DailyBehavior.model_construct(
+            date=today,
+            total_steps=today_steps,
+            exercise_minutes=today_ex_mins,
+            exercise_done=today_ex_done,
+            sleep_duration_minutes=today_sleep * 60,
+        )
+        st.session_state['today_key'] = today_key
+    today_record = st.session_state['today_record']
     
-    # Get the row for today (last row)
-    today_features = df_full.iloc[[-1]] 
+    # We need history context to calculate features (rolling windows),
+    # but only the trailing MAX_WINDOW days of it — scoring one new day
+    # doesn't require re-enhancing the whole history.
+    # (The models themselves are still trained on full history, cached above.)
+    tail = history_data[-(FeatureEngineer.MAX_WINDOW + 1):]
+    df_full = engineer.enhance(tail + [today_record])
+
+    # The run-length counters look back past the tail: if the miss run
+    # covers the whole slice, seed it from the cached full-history frame
+    # (row just before the tail) so a 60-day absence isn't clamped to 30.
+    k = len(history_data) - len(df_full)
+    if k >= 0:
+        extend_miss_run(df_full, int(df_features['consecutive_misses'].iloc[k]))
+
+    # One dict materialization shared by burnout + recommender below
+    last_row_dict = {c: df_full[c].iat[-1] for c in df_full.columns}
     
     # Predictions
     
-    # 1. Adherence
+    # 1. Adherence (vector fast path: no single-row DataFrame round-trip)
     try:
-        adh_prob_val = adherence_model.predict_next_day_proba(today_features)
+        x_today = df_full[adherence_model.feature_columns].to_numpy(dtype=float)[-1]
+        adh_prob_val = adherence_model.predict_next_day_proba_vector(x_today)
     except Exception as e:
         adh_prob_val = 0.0
         st.error(f"Prediction Error: {e}")
     
     # 2. Burnout
     try:
-        burnout_risk = burnout_model.predict_current_risk(today_features.iloc[0].to_dict())
+        burnout_risk = burnout_model.predict_current_risk(last_row_dict)
     except Exception as e:
         burnout_risk = 0.0
         # st.error(f"Burnout Prediction Error: {e}")
@@ -296,7 +363,7 @@ if st.button("Analyze Today"):
     # Recommendation
     st.subheader("Engine Recommendation")
     
-    recommender = RecommendationEngine()
+    recommender = get_recommender()
     
     try:
         rec = recommender.generate_recommendation(
@@ -305,7 +372,7 @@ if st.button("Analyze Today"):
             adherence_prob=adh_prob_val,
             burnout_risk=burnout_risk,
             is_anomaly=False, # Anomaly detection not active in interactive mode yet
-            recent_features=today_features.iloc[0].to_dict()
+            recent_features=last_row_dict
         )
         
         # Display the formal engine response
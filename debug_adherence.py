@@ -11,38 +11,44 @@ from src.domain.schemas import DailyBehavior
 from src.processing.features import FeatureEngineer
 from src.models.adherence import AdherenceModel
 
+rng = np.random.default_rng()
+
+def _gen_arrays(days):
+    # Numeric kernel kept free of Python objects: batched draws only.
+    # Normal active user.
+    steps = 8000 + rng.integers(-1000, 1000, days)
+    sleep = 480 + rng.integers(-30, 30, days)
+    ex_done = rng.binomial(1, 0.5, size=days).astype(bool)
+    ex_mins = np.where(ex_done, 45, 0)
+    return steps, sleep, ex_done, ex_mins
+
 def generate_history(days):
-    data = []
     start = datetime.now() - timedelta(days=days)
-    for i in range(days):
-        d = start + timedelta(days=i)
-        # Normal active user
-        steps = 8000 + np.random.randint(-1000, 1000)
-        sleep = 480 + np.random.randint(-30, 30)
-        # Exercise 
-        ex_done = (np.random.random() > 0.5)
-        ex_mins = 45 if ex_done else 0
-        
-        data.append(DailyBehavior(
-            date=d.date(),
-            total_steps=steps,
-            exercise_minutes=ex_mins,
-            exercise_done=ex_done,
-            sleep_duration_minutes=sleep,
+    steps, sleep, ex_done, ex_mins = _gen_arrays(days)
+    dates = pd.date_range(start=start, periods=days, freq='D').date
+
+    return [
+        DailyBehavior(
+            date=d,
+            total_steps=int(s),
+            exercise_minutes=int(m),
+            exercise_done=bool(e),
+            sleep_duration_minutes=int(sl),
             sleep_start_time=None,
             sleep_end_time=None,
             exercise_start_time=None
-        ))
-    return data
+        )
+        for d, s, m, e, sl in zip(dates, steps, ex_mins, ex_done, sleep)
+    ]
 
 # 1. Generate normal history
 history = generate_history(100)
 
-# 2. Modify last 14 days to be inactive
+# 2. Replace last 14 days with inactive copies (records are frozen)
 for i in range(1, 15):
-    history[-i].total_steps = 1000
-    history[-i].exercise_done = False
-    history[-i].exercise_minutes = 0
+    history[-i] = history[-i].model_copy(
+        update={'total_steps': 1000, 'exercise_done': False, 'exercise_minutes': 0}
+    )
 
 # 3. Features
 engineer = FeatureEngineer()
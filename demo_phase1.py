@@ -17,13 +17,14 @@ def main():
     events = provider.fetch_all_events(start_date, end_date)
     print(f"Fetched {len(events)} raw events.")
     
-    # 3. Aggregate to Daily Canonical
+    # 3. Aggregate to Daily Canonical (column arrays — the only consumer
+    #    here is the DataFrame view, so skip per-day objects)
     aggregator = DailyAggregator()
-    daily_records = aggregator.aggregate(events)
-    print(f"Aggregated into {len(daily_records)} daily records.")
-    
+    columns = aggregator.aggregate_to_arrays(events)
+    print(f"Aggregated into {len(columns['date'])} daily records.")
+
     # 4. Display as DataFrame (Production-like view)
-    df = pd.DataFrame([r.model_dump() for r in daily_records])
+    df = pd.DataFrame(columns)
     
     # Clean up display
     cols = ['date', 'total_steps', 'sleep_duration_minutes', 'exercise_minutes', 'exercise_done', 'data_missing_flag']
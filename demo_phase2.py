@@ -54,7 +54,7 @@ def main():
         
     # 4. Inference (Predict Tomorrow)
     print("\n4. Live Inference:")
-    last_day = df_features.iloc[[-1]] # The most recent day
+    last_day = df_features.iloc[-1:] # The most recent day (slice, not fancy index)
     prob = model.predict_next_day_proba(last_day)
     
     print(f"   Based on data from {last_day.index[0].date()},")
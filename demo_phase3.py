@@ -66,17 +66,19 @@ def main():
     metrics_anom = anomaly_detector.train(df_features)
     print(f"   Detected {metrics_anom.get('anomalies_detected_history')} historical days as 'Anomalies'.")
     
-    # Check last few days for anomalies
+    # Check last few days for anomalies (one batched sklearn call)
     print("   Checking recent days for behavioral anomalies:")
     recent_days = df_features.tail(5)
-    for date, row in recent_days.iterrows():
-        result = anomaly_detector.check_anomaly(row)
-        status = "ALERT" if result['is_anomaly'] else "Normal"
-        print(f"     - {date.date()}: {status} (Score: {result['severity_score']:.2f})")
-        if result['is_anomaly']:
+    is_anomaly, severity = anomaly_detector.check_anomalies_batch(recent_days)
+    low_sleep = (recent_days['sleep_duration_minutes'] < 300).to_numpy()
+    low_steps = (recent_days['total_steps'] < 1000).to_numpy()
+    for date, flag, score, sleepy, sedentary in zip(recent_days.index, is_anomaly, severity, low_sleep, low_steps):
+        status = "ALERT" if flag else "Normal"
+        print(f"     - {date.date()}: {status} (Score: {score:.2f})")
+        if flag:
             # Explain why (simplistic check)
-            if row['sleep_duration_minutes'] < 300: print("       -> Low sleep detected")
-            if row['total_steps'] < 1000: print("       -> Extremely low activity")
+            if sleepy: print("       -> Low sleep detected")
+            if sedentary: print("       -> Extremely low activity")
 
     print("\nPhase 3 Complete: Survival Analysis & Anomaly Detection operational.")
 
@@ -1,29 +1,37 @@
+import asyncio
 import sys
 import os
 
 # Add project root to python path to allow imports from 'src'
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter, ValidationError
 from typing import List
 from datetime import datetime, timedelta
+from functools import cached_property
 import pandas as pd
 import numpy as np
 import uvicorn
 
-from src.processing.features import FeatureEngineer
+from src.processing.features import FeatureEngineer, extend_miss_run
 from src.models.adherence import AdherenceModel
 from src.models.burnout import BurnoutRiskModel
 from src.models.anomaly import AnomalyDetector
 from src.processing.recommender import RecommendationEngine
 from src.domain.schemas import DailyBehavior
 from src.domain.api_schemas import (
-    EngineResponse, SimulationParams, TrainingResponse, DailyInput, HistoryTrainRequest
+    EngineResponse, SimulationParams, DailyInput, HistoryTrainRequest
 )
 
 app = FastAPI(title="Habit Engine API", version="2.0.0")
 
+# Compiled once at import: validate_json parses straight from request bytes
+# in pydantic's Rust core, skipping FastAPI's per-field unwrap + rewrap.
+_TRAIN_REQUEST_ADAPTER = TypeAdapter(HistoryTrainRequest)
+
 # CORS
 app.add_middleware(
     CORSMiddleware,
@@ -37,8 +45,12 @@ app.add_middleware(
 class EngineState:
     def __init__(self):
         self.history_data: List[DailyBehavior] = []
-        self.df_history: pd.DataFrame = pd.DataFrame()
         self.df_features: pd.DataFrame = pd.DataFrame()
+
+        # Streak-scan inputs, extracted from df_features once at train time
+        # so /predict only appends today's values.
+        self.ex_done_hist: np.ndarray = np.empty(0, dtype=np.int8)
+        self.ex_minutes_hist: np.ndarray = np.empty(0)
         
         # Components
         self.engineer = FeatureEngineer()
@@ -49,144 +61,233 @@ class EngineState:
         
         self.is_trained = False
 
+    @cached_property
+    def df_history(self) -> pd.DataFrame:
+        """Raw history as a DataFrame; nothing on the training path reads
+        it, so it's only built if something actually asks."""
+        return behaviors_to_df(self.history_data)
+
+# Swapped wholesale by the training endpoints (copy-on-train): handlers bind
+# a local reference at entry so readers always see one consistent snapshot.
 state = EngineState()
 
-# HELPER
+# HELPERS
+def behaviors_to_df(records: List[DailyBehavior]) -> pd.DataFrame:
+    """Columnar build: one list per field instead of N model_dump dicts."""
+    return pd.DataFrame({
+        col: [getattr(r, col) for r in records]
+        for col in DailyBehavior.model_fields
+    })
+
 def generate_history(params: SimulationParams) -> List[DailyBehavior]:
-    data = []
+    n = params.history_days
     end_date = datetime.now().date()
-    start_date = end_date - timedelta(days=params.history_days)
-    
+    start_date = end_date - timedelta(days=n)
+
     # Probabilities
     ex_prob = params.exercise_freq / 7.0
     mean_ex_dur = 45 # hardcoded for simplicity or logic reuse
-    
-    for i in range(params.history_days):
-        current_date = start_date + timedelta(days=i)
-        
-        # Steps
-        steps = int(np.random.normal(params.avg_steps, params.avg_steps * params.steps_volatility))
-        steps = max(0, steps)
-        
-        # Exercise
-        if np.random.random() < ex_prob:
-            ex_done = True
-            ex_mins = max(10, int(np.random.normal(mean_ex_dur, mean_ex_dur * 0.2)))
-        else:
-            ex_done = False
-            ex_mins = 0
-            
-        # Sleep
-        sleep_mins = max(0, int(np.random.normal(params.avg_sleep_hours * 60, params.avg_sleep_hours * 60 * params.sleep_volatility)))
-        
-        record = DailyBehavior(
-            date=current_date,
-            total_steps=steps,
-            exercise_minutes=ex_mins,
-            exercise_done=ex_done,
-            sleep_duration_minutes=sleep_mins,
+
+    # PCG64 generator: faster bulk draws than the legacy global API, no
+    # shared module state, and reproducible when params.seed is set.
+    rng = np.random.default_rng(params.seed)
+
+    # One vectorized draw per signal instead of n scalar RNG calls
+    steps = np.maximum(0, rng.normal(params.avg_steps, params.avg_steps * params.steps_volatility, n).astype(int))
+    ex_done = rng.random(n) < ex_prob
+    ex_mins = np.where(ex_done, np.maximum(10, rng.normal(mean_ex_dur, mean_ex_dur * 0.2, n).astype(int)), 0)
+    sleep_mins = np.maximum(0, rng.normal(params.avg_sleep_hours * 60, params.avg_sleep_hours * 60 * params.sleep_volatility, n).astype(int))
+    dates = pd.date_range(start=start_date, periods=n, freq='D').date
+
+    # model_construct: arrays are already the right types, skip per-record validation
+    return [
+        DailyBehavior.model_construct(
+            date=d,
+            total_steps=int(s),
+            exercise_minutes=int(m),
+            exercise_done=bool(e),
+            sleep_duration_minutes=int(sl),
             data_missing_flag=False,
             sleep_start_time=None,
             sleep_end_time=None,
             exercise_start_time=None
         )
-        data.append(record)
-        
-    return data
+        for d, s, m, e, sl in zip(dates, steps, ex_mins, ex_done, sleep_mins)
+    ]
+
+def _initial_motivation(ex_done: np.ndarray, ex_minutes: np.ndarray) -> float:
+    """
+    Average exercise minutes over the first 3 days of the current streak.
+    A "break" is any 3-day window with no exercise; the streak starts just
+    after the last break (whole history if none, or if the break runs to
+    the final day). NumPy fallback; replaced by the numba kernel below
+    when available.
+    """
+    conv = np.convolve(ex_done, np.ones(3, dtype=np.int8), mode='valid')
+    breaks = np.flatnonzero(conv == 0)
+    if breaks.size and (breaks[-1] + 2) < len(ex_done) - 1:
+        streak_start = breaks[-1] + 3
+    else:
+        streak_start = 0
+    if streak_start >= len(ex_done):
+        return 30.0  # Default if empty (shim)
+    count = min(3, len(ex_done) - streak_start)
+    return float(ex_minutes[streak_start:streak_start + count].mean())
 
-@app.post("/simulate-train", response_model=TrainingResponse)
-def simulate_and_train(params: SimulationParams):
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(cache=True)
+    def _initial_motivation(ex_done, ex_minutes):  # noqa: F811 - jitted variant
+        n = ex_done.size
+        if n == 0:
+            return 30.0
+        last_break_end = -1
+        for i in range(2, n):
+            if ex_done[i] == 0 and ex_done[i - 1] == 0 and ex_done[i - 2] == 0:
+                last_break_end = i
+        if 0 <= last_break_end < n - 1:
+            start = last_break_end + 1
+        else:
+            start = 0
+        count = min(3, n - start)
+        s = 0.0
+        for k in range(count):
+            s += ex_minutes[start + k]
+        return s / count
+
+    # Warm once at import so the first /predict doesn't pay compile cost
+    _initial_motivation(np.zeros(3, dtype=np.int8), np.zeros(3))
+
+def _simulate_train_impl(params: SimulationParams) -> dict:
+    global state
     try:
+        # Train into a fresh state; concurrent /predict keeps reading the old one
+        new_state = EngineState()
+
         # 1. Generate
-        state.history_data = generate_history(params)
-        state.df_history = pd.DataFrame([d.model_dump() for d in state.history_data])
+        new_state.history_data = generate_history(params)
         
         # 2. Features
-        state.df_features = state.engineer.enhance(state.history_data)
+        new_state.df_features = new_state.engineer.enhance(new_state.history_data)
+        new_state.ex_done_hist = new_state.df_features['exercise_done'].to_numpy(dtype=np.int8)
+        new_state.ex_minutes_hist = new_state.df_features['exercise_minutes'].to_numpy(dtype=float)
         
         # 3. Train
-        # Adherence
+        # Adherence: soft failures come back as a status dict without an
+        # 'accuracy' key; only a genuine fit error (e.g. single-class
+        # target) raises, and that's a ValueError.
         try:
-            metrics_adh = state.adherence_model.train(state.df_features)
-            acc = metrics_adh.get('accuracy', 0.0)
-        except:
-             acc = 0.0
+            metrics_adh = new_state.adherence_model.train(new_state.df_features)
+        except ValueError:
+            metrics_adh = {}
+        acc = metrics_adh.get('accuracy', 0.0)
 
-        # Burnout
-        try:
-            metrics_burn = state.burnout_model.train(state.df_features)
-            c_index = metrics_burn.get('concordance', 0.0)
-        except:
-             c_index = 0.0
-             
+        # Burnout: train() never raises — it reports via its status dict
+        metrics_burn = new_state.burnout_model.train(new_state.df_features)
+        c_index = metrics_burn.get('concordance', 0.0)
+        
         # Anomaly Detection
-        state.anomaly_detector.train(state.df_features)
+        new_state.anomaly_detector.train(new_state.df_features)
         
-        state.is_trained = True
+        new_state.is_trained = True
+
+        # Atomic publish: single reference assignment
+        state = new_state
         
-        return TrainingResponse(
-            message="Training Complete",
-            history_points=len(state.history_data),
-            adherence_accuracy=acc,
-            burnout_c_index=c_index,
-            history=state.history_data
-        )
+        # Plain dict + ORJSONResponse: orjson serializes dates/datetimes
+        # natively, skipping pydantic's per-field JSON encoder for the
+        # potentially large history list.
+        return {
+            "message": "Training Complete",
+            "history_points": len(new_state.history_data),
+            "adherence_accuracy": acc,
+            "burnout_c_index": c_index,
+            "history": [d.model_dump() for d in new_state.history_data]
+        }
     except Exception as e:
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/train-custom", response_model=TrainingResponse)
-def train_custom(request: HistoryTrainRequest):
+@app.post("/simulate-train", response_class=ORJSONResponse)
+async def simulate_and_train(params: SimulationParams):
+    # CPU-heavy pipeline runs in a worker thread so the event loop stays free
+    return await asyncio.to_thread(_simulate_train_impl, params)
+
+def _train_custom_impl(body: bytes) -> dict:
+    global state
+    try:
+        req = _TRAIN_REQUEST_ADAPTER.validate_json(body)
+    except ValidationError as e:
+        # include_input would embed the raw bytes body, which JSONResponse
+        # can't serialize; the loc/msg/type triples are the useful part.
+        raise HTTPException(
+            status_code=422,
+            detail=e.errors(include_input=False, include_url=False),
+        )
+
     try:
+        # Train into a fresh state; concurrent /predict keeps reading the old one
+        new_state = EngineState()
+
         # 1. Load Provided History
         # Ensure we have date objects, pydantic handles this mostly but pandas needs help
-        state.history_data = request.history
-        state.df_history = pd.DataFrame([d.model_dump() for d in state.history_data])
+        new_state.history_data = req.history
         
         # 2. Features
-        state.df_features = state.engineer.enhance(state.history_data)
-        
-        # 3. Train
-        metrics_adh = {}
-        metrics_burn = {}
+        new_state.df_features = new_state.engineer.enhance(new_state.history_data)
+        new_state.ex_done_hist = new_state.df_features['exercise_done'].to_numpy(dtype=np.int8)
+        new_state.ex_minutes_hist = new_state.df_features['exercise_minutes'].to_numpy(dtype=float)
         
-        # Adherence
+        # 3. Train (same narrow handling as /simulate-train)
         try:
-            metrics_adh = state.adherence_model.train(state.df_features)
-            acc = metrics_adh.get('accuracy', 0.0)
-        except:
-             acc = 0.0
+            metrics_adh = new_state.adherence_model.train(new_state.df_features)
+        except ValueError:
+            metrics_adh = {}
+        acc = metrics_adh.get('accuracy', 0.0)
 
-        # Burnout
-        try:
-            metrics_burn = state.burnout_model.train(state.df_features)
-            c_index = metrics_burn.get('concordance', 0.0)
-        except:
-             c_index = 0.0
-             
+        metrics_burn = new_state.burnout_model.train(new_state.df_features)
+        c_index = metrics_burn.get('concordance', 0.0)
+        
         # Anomaly Detection
-        state.anomaly_detector.train(state.df_features)
+        new_state.anomaly_detector.train(new_state.df_features)
         
-        state.is_trained = True
+        new_state.is_trained = True
+
+        # Atomic publish: single reference assignment
+        state = new_state
         
-        return TrainingResponse(
-            message="Training Complete (Custom Data)",
-            history_points=len(state.history_data),
-            adherence_accuracy=acc,
-            burnout_c_index=c_index,
-            history=state.history_data
-        )
+        return {
+            "message": "Training Complete (Custom Data)",
+            "history_points": len(new_state.history_data),
+            "adherence_accuracy": acc,
+            "burnout_c_index": c_index,
+            "history": [d.model_dump() for d in new_state.history_data]
+        }
     except Exception as e:
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/predict", response_model=EngineResponse)
-def predict(input: DailyInput):
-    if not state.is_trained:
+@app.post("/train-custom", response_class=ORJSONResponse)
+async def train_custom(request: Request):
+    # Raw body: validation runs in the worker thread via the TypeAdapter
+    body = await request.body()
+    return await asyncio.to_thread(_train_custom_impl, body)
+
+def _predict_impl(input: DailyInput) -> EngineResponse:
+    # Bind the current snapshot once; a concurrent train swaps the global
+    # reference but can't tear this request's view.
+    s = state
+    if not s.is_trained:
         raise HTTPException(status_code=400, detail="Models not trained. Call /simulate-train first.")
-    
+    if len(s.history_data) < 14:
+        raise HTTPException(status_code=400, detail="Insufficient history for prediction (need 14+ days)")
+
     try:
         # Create Today's Record
         today = datetime.now().date()
@@ -199,39 +300,34 @@ def predict(input: DailyInput):
             data_missing_flag=False
         )
         
-        # Append
-        full_list = state.history_data + [today_record]
-        df_full = state.engineer.enhance(full_list)
-        today_features = df_full.iloc[[-1]]
-        feature_row = df_full.iloc[-1].to_dict()
-        
-        # Calculate Initial Motivation (Streak-based)
-        # Find start of current streak: Last time rolling_misses_3d was 3 (i.e., 3 consecutive misses)
-        # or simpler: Calculate rolling sum of exercise_done. If 0 over window 3, that's a break.
-        
-        # 1. Identify breaks
-        rolling_activity = df_full['exercise_done'].astype(int).rolling(window=3).sum()
-        break_points = rolling_activity[rolling_activity == 0].index
+        # Features: history features were built at train time (s.df_features);
+        # only the trailing rolling window + today needs computing per request.
+        tail = s.history_data[-(FeatureEngineer.MAX_WINDOW + 1):]
+        df_tail = s.engineer.enhance(tail + [today_record])
+
+        # The run-length counters look back past the tail: if the miss run
+        # covers the whole slice, seed it from the cached full-history frame
+        # (row just before the tail) so a 60-day absence isn't clamped to 30.
+        k = len(s.history_data) - len(df_tail)
+        if k >= 0:
+            extend_miss_run(df_tail, int(s.df_features['consecutive_misses'].iloc[k]))
+
+        # Pull today's row out of pandas once; everything downstream works on
+        # the raw array / plain dict (dict(zip(...)) beats Series.to_dict()).
+        last_row = df_tail.iloc[-1]
+        feature_arr = last_row.to_numpy()
+        feature_row = dict(zip(df_tail.columns, feature_arr))
         
-        # 2. Slice current streak
-        if len(break_points) > 0 and break_points[-1] < df_full.index[-1]:
-            last_break_date = break_points[-1]
-            # Streak starts strictly after the break
-            current_streak_df = df_full.loc[last_break_date:].iloc[1:]
-        else:
-            current_streak_df = df_full
-            
-        # 3. Average first 3 days
-        if len(current_streak_df) > 0:
-            count = min(3, len(current_streak_df))
-            init_motivation = current_streak_df['exercise_minutes'].iloc[:count].mean()
-        else:
-            init_motivation = 30.0 # Default if empty (shim)
+        # Calculate Initial Motivation (Streak-based): one fused scan over
+        # cached history features plus today's flag.
+        ex = np.append(s.ex_done_hist, np.int8(today_record.exercise_done))
+        ex_minutes = np.append(s.ex_minutes_hist, float(today_record.exercise_minutes))
+        init_motivation = float(_initial_motivation(ex, ex_minutes))
 
         # Predictions
         # Adherence
         try:
-            adh_prob = state.adherence_model.predict_next_day_proba(today_features)
+            adh_prob = s.adherence_model.predict_from_feature_row(feature_arr)
         except:
             adh_prob = 0.5
             
@@ -242,16 +338,16 @@ def predict(input: DailyInput):
             'avg_sleep_var': feature_row.get('sleep_variance_7d', 50),
             'initial_motivation': init_motivation
         }
-        burnout_risk = state.burnout_model.predict_current_risk(risk_input)
+        burnout_risk = s.burnout_model.predict_current_risk(risk_input)
         
         # Anomaly Check
-        anomaly_res = state.anomaly_detector.check_anomaly(today_features.iloc[0])
+        anomaly_res = s.anomaly_detector.check_anomaly(last_row)
         print(f"DEBUG: Anomaly check for {input.steps} steps: {anomaly_res}")
         is_anomaly = anomaly_res.get('is_anomaly', False)
         anomaly_context = anomaly_res.get('context', None)
         
         # Recommendation
-        rec = state.recommender.generate_recommendation(
+        rec = s.recommender.generate_recommendation(
             user_id="demo_user",
             date_str=str(today),
             adherence_prob=adh_prob,
@@ -268,5 +364,9 @@ def predict(input: DailyInput):
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/predict", response_model=EngineResponse)
+async def predict(input: DailyInput):
+    return await asyncio.to_thread(_predict_impl, input)
+
 if __name__ == "__main__":
     uvicorn.run("src.api.main:app", host="0.0.0.0", port=8000, reload=True)
@@ -1,6 +1,6 @@
 from enum import Enum
 from typing import Optional, List
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from src.domain.schemas import DailyBehavior
 
 class RecommendationType(str, Enum):
@@ -35,6 +35,7 @@ class SimulationParams(BaseModel):
     exercise_freq: int = 3
     avg_sleep_hours: float = 7.5
     sleep_volatility: float = 0.2
+    seed: Optional[int] = None  # set for reproducible simulations
 
 class TrainingResponse(BaseModel):
     message: str
@@ -47,6 +48,8 @@ class HistoryTrainRequest(BaseModel):
     history: List[DailyBehavior]
 
 class DailyInput(BaseModel):
-    steps: int
-    sleep_hours: float
-    exercise_minutes: int
+    # Tight bounds at the boundary: absurd inputs get a 422 before any
+    # feature engineering or model work happens.
+    steps: int = Field(ge=0, le=200000)
+    sleep_hours: float = Field(ge=0, le=24)
+    exercise_minutes: int = Field(ge=0, le=1440)
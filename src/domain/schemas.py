@@ -28,9 +28,10 @@ class RawHealthEvent(BaseModel):
     end_time: datetime
     value: float  # For steps, this is count. For others, maybe specific metric.
     metadata: Dict[str, Any] = {}
-    
-    # Validation config
-    model_config = ConfigDict(from_attributes=True)
+
+    # Immutable value object: frozen instances are lighter and hashable,
+    # and 'forbid' catches typo'd field names at construction time.
+    model_config = ConfigDict(frozen=True, extra='forbid')
 
 class DailyBehavior(BaseModel):
     """
@@ -61,5 +62,5 @@ class DailyBehavior(BaseModel):
     # Behavioral Signals (Derived)
     streak_active: bool = False
     days_since_last_miss: int = 0
-    
-    model_config = ConfigDict(from_attributes=True)
+
+    model_config = ConfigDict(frozen=True, extra='forbid')
@@ -1,5 +1,5 @@
 import uuid
-import random
+import numpy as np
 from datetime import datetime, timedelta
 from typing import List
 from src.domain.schemas import RawHealthEvent, EventType, HealthSource
@@ -9,118 +9,119 @@ class MockHealthProvider(HealthDataProvider):
     """
     Simulated Health Provider for dev & testing.
     Generates realistic-looking data with some noise to test robustness.
+
+    All three fetchers sample their random draws in one batched RNG call per
+    signal and bulk-construct events, so month/year-scale ranges stay cheap.
     """
-    
+
     def __init__(self, seed: int = 42):
-        random.seed(seed)
+        # Instance-local PCG64 generator: reproducible per provider without
+        # mutating global RNG state, and cheaper per draw than the legacy API.
+        self.rng = np.random.default_rng(seed)
+
+    @staticmethod
+    def _day_grid(start_time: datetime, end_time: datetime):
+        """Midnight of every calendar day in the range, as datetime64."""
+        n_days = (end_time.date() - start_time.date()).days + 1
+        base = np.datetime64(start_time.date()) + np.arange(n_days).astype('timedelta64[D]')
+        return base, n_days
 
     def fetch_all_events(self, start_time: datetime, end_time: datetime) -> List[RawHealthEvent]:
         events = []
         events.extend(self.fetch_steps(start_time, end_time))
         events.extend(self.fetch_sleep(start_time, end_time))
         events.extend(self.fetch_exercise(start_time, end_time))
-        
+
         # Sort by start time for realism
         events.sort(key=lambda x: x.start_time)
         return events
 
     def fetch_steps(self, start_time: datetime, end_time: datetime) -> List[RawHealthEvent]:
-        events = []
-        current = start_time
-        while current < end_time:
-            # Simulate bursts of walking during the day (8am - 8pm)
-            if 8 <= current.hour <= 20:
-                if random.random() > 0.3: # 70% chance of movement in active hours
-                    duration_s = random.randint(60, 600)  # 1 to 10 mins walk
-                    steps = int(duration_s * random.uniform(1.0, 2.0)) # ~1-2 steps/sec
-                    
-                    event_end = current + timedelta(seconds=duration_s)
-                    if event_end > end_time: break
-                    
-                    events.append(RawHealthEvent(
-                        event_id=str(uuid.uuid4()),
-                        event_type=EventType.STEPS,
-                        source=HealthSource.MOCK,
-                        start_time=current,
-                        end_time=event_end,
-                        value=steps
-                    ))
-                    current = event_end + timedelta(minutes=random.randint(5, 60))
-                else:
-                    current += timedelta(hours=1)
-            else:
-                # Night time, sparse movement
-                current += timedelta(hours=1)
-                
-        return events
+        # One candidate walking burst per active hour (8am - 8pm) per day,
+        # drawn as flat arrays instead of a sequential clock loop.
+        base, n_days = self._day_grid(start_time, end_time)
+        hours = np.arange(8, 21)
+        starts = (base[:, None] + hours.astype('timedelta64[h]')).ravel()
+        n = starts.size
+
+        occurred = self.rng.random(n) < 0.7  # 70% chance of movement in active hours
+        duration_s = self.rng.integers(60, 601, n)  # 1 to 10 mins walk
+        steps = (duration_s * self.rng.uniform(1.0, 2.0, n)).astype(int)  # ~1-2 steps/sec
+        ends = starts + duration_s.astype('timedelta64[s]')
+
+        mask = occurred & (starts >= np.datetime64(start_time)) & (ends <= np.datetime64(end_time))
+        start_dts = starts[mask].astype('datetime64[us]').tolist()
+        end_dts = ends[mask].astype('datetime64[us]').tolist()
+
+        return [
+            RawHealthEvent.model_construct(
+                event_id=str(uuid.uuid4()),
+                event_type=EventType.STEPS,
+                source=HealthSource.MOCK,
+                start_time=st,
+                end_time=en,
+                value=float(v),
+                metadata={}
+            )
+            for st, en, v in zip(start_dts, end_dts, steps[mask])
+        ]
 
     def fetch_sleep(self, start_time: datetime, end_time: datetime) -> List[RawHealthEvent]:
-        events = []
-        # Naive simulation: find every "night" in the range
-        # Iterate by days
-        current_date = start_time.date()
-        end_date = end_time.date()
-        
-        delta = end_date - current_date
-        
-        for i in range(delta.days + 1):
-            day = current_date + timedelta(days=i)
-            
-            # Simulate sleep start 10pm - 2am
-            sleep_hour = random.randint(22, 26) # 22=10pm, 26=2am next day
-            start_hour_normalized = sleep_hour if sleep_hour < 24 else sleep_hour - 24
-            
-            # Create datetime
-            if sleep_hour >= 24:
-                # It's actually the next morning physically
-                sleep_start = datetime.combine(day + timedelta(days=1), datetime.min.time()) + timedelta(hours=start_hour_normalized)
-            else:
-                sleep_start = datetime.combine(day, datetime.min.time()) + timedelta(hours=start_hour_normalized)
-                
-            # Random jitter minutes
-            sleep_start += timedelta(minutes=random.randint(0, 59))
-            
-            # Duration 5-9 hours
-            duration_hours = random.uniform(5.0, 9.0)
-            sleep_end = sleep_start + timedelta(hours=duration_hours)
-            
-            if sleep_start >= start_time and sleep_end <= end_time:
-                events.append(RawHealthEvent(
-                    event_id=str(uuid.uuid4()),
-                    event_type=EventType.SLEEP,
-                    source=HealthSource.MOCK,
-                    start_time=sleep_start,
-                    end_time=sleep_end,
-                    value=duration_hours * 60, # Minutes
-                    metadata={"efficiency": random.uniform(0.8, 0.99)}
-                ))
-                
-        return events
+        base, n_days = self._day_grid(start_time, end_time)
+
+        # Sleep start 10pm - 2am (22..26 wraps into the next morning), with
+        # minute jitter; duration 5-9 hours.
+        sleep_hours = self.rng.integers(22, 27, n_days)
+        jitter = self.rng.integers(0, 60, n_days)
+        duration_hours = self.rng.uniform(5.0, 9.0, n_days)
+        efficiencies = self.rng.uniform(0.8, 0.99, n_days)
+
+        starts = base + sleep_hours.astype('timedelta64[h]') + jitter.astype('timedelta64[m]')
+        ends = starts + (duration_hours * 3600).astype('timedelta64[s]')
+
+        mask = (starts >= np.datetime64(start_time)) & (ends <= np.datetime64(end_time))
+        start_dts = starts[mask].astype('datetime64[us]').tolist()
+        end_dts = ends[mask].astype('datetime64[us]').tolist()
+
+        return [
+            RawHealthEvent.model_construct(
+                event_id=str(uuid.uuid4()),
+                event_type=EventType.SLEEP,
+                source=HealthSource.MOCK,
+                start_time=st,
+                end_time=en,
+                value=float(dur * 60),  # Minutes
+                metadata={"efficiency": float(eff)}
+            )
+            for st, en, dur, eff in zip(
+                start_dts, end_dts, duration_hours[mask], efficiencies[mask]
+            )
+        ]
 
     def fetch_exercise(self, start_time: datetime, end_time: datetime) -> List[RawHealthEvent]:
-        events = []
-        # Exercise 3 times a week randomly
-        current_date = start_time.date()
-        end_date = end_time.date()
-        delta = end_date - current_date
-
-        for i in range(delta.days + 1):
-            day = current_date + timedelta(days=i)
-            
-            if random.random() < 0.4: # 40% chance of exercise
-                # Random time
-                ex_start = datetime.combine(day, datetime.min.time()) + timedelta(hours=random.randint(7, 20))
-                duration = random.randint(20, 60) # minutes
-                ex_end = ex_start + timedelta(minutes=duration)
-                
-                if ex_start >= start_time and ex_end <= end_time:
-                    events.append(RawHealthEvent(
-                        event_id=str(uuid.uuid4()),
-                        event_type=EventType.EXERCISE,
-                        source=HealthSource.MOCK,
-                        start_time=ex_start,
-                        end_time=ex_end,
-                        value=duration,
-                        metadata={"type": random.choice(["running", "cycling", "weightlifting", "yoga"])}
-                    ))
-        return events
+        base, n_days = self._day_grid(start_time, end_time)
+
+        occurred = self.rng.random(n_days) < 0.4  # 40% chance of exercise
+        ex_hours = self.rng.integers(7, 21, n_days)
+        durations = self.rng.integers(20, 61, n_days)  # minutes
+        types = self.rng.choice(["running", "cycling", "weightlifting", "yoga"], n_days)
+
+        starts = base + ex_hours.astype('timedelta64[h]')
+        ends = starts + durations.astype('timedelta64[m]')
+
+        mask = occurred & (starts >= np.datetime64(start_time)) & (ends <= np.datetime64(end_time))
+        start_dts = starts[mask].astype('datetime64[us]').tolist()
+        end_dts = ends[mask].astype('datetime64[us]').tolist()
+
+        return [
+            RawHealthEvent.model_construct(
+                event_id=str(uuid.uuid4()),
+                event_type=EventType.EXERCISE,
+                source=HealthSource.MOCK,
+                start_time=st,
+                end_time=en,
+                value=float(dur),
+                metadata={"type": str(t)}
+            )
+            for st, en, dur, t in zip(start_dts, end_dts, durations[mask], types[mask])
+        ]
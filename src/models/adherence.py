@@ -1,9 +1,37 @@
+import math
 from typing import Any, Dict, Tuple
+import numpy as np
 import pandas as pd
 from sklearn.linear_model import LogisticRegression
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import accuracy_score, roc_auc_score, confusion_matrix
 
+from src.models.scaling import registry as scaler_registry
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def _score_adherence(row, col_idx, mean, scale, coef, intercept):
+        """Standardize + dot + sigmoid fused into one loop over the features."""
+        s = 0.0
+        for k in range(coef.size):
+            i = col_idx[k]
+            s += ((row[i] - mean[k]) / scale[k]) * coef[k]
+        return 1.0 / (1.0 + math.exp(-(s + intercept)))
+
+    # Warm the kernel at import so the first real request doesn't pay the
+    # compile cost (cache=True makes later processes hit the disk cache).
+    _score_adherence(
+        np.zeros(1), np.zeros(1, dtype=np.int64),
+        np.zeros(1), np.ones(1), np.zeros(1), 0.0
+    )
+else:
+    _score_adherence = None
+
 class AdherenceModel:
     """
     Predicts probability of adhering to habit (exercise) TOMORROW.
@@ -65,11 +93,24 @@ class AdherenceModel:
         # Training
         self.model.fit(X_train_scaled, y_train)
         self.is_trained = True
+
+        # Cache the fitted parameters as plain arrays so inference can skip
+        # pandas column reindexing and sklearn's predict_proba dispatch.
+        # Stats go through the shared registry; the block rows are one
+        # contiguous buffer per model.
+        scaler_registry.update(self.feature_columns, self.scaler.mean_, self.scaler.scale_)
+        stats = scaler_registry.block(self.feature_columns)
+        self.col_idx = np.array([df.columns.get_loc(c) for c in self.feature_columns])
+        self._mean = stats[0]
+        self._scale = stats[1]
+        self._coef = self.model.coef_[0]
+        self._intercept = self.model.intercept_[0]
         
-        # Evaluation
-        y_pred = self.model.predict(X_test_scaled)
+        # Evaluation: one predict_proba pass; thresholding it reproduces
+        # predict() without re-running the model.
         y_proba = self.model.predict_proba(X_test_scaled)[:, 1]
-        
+        y_pred = (y_proba >= 0.5).astype(np.int8)
+
         try:
             auc = roc_auc_score(y_test, y_proba)
         except ValueError:
@@ -96,3 +137,34 @@ class AdherenceModel:
         
         proba = self.model.predict_proba(X_scaled)[0, 1]
         return proba
+
+    def predict_next_day_proba_vector(self, feature_vector: np.ndarray) -> float:
+        """
+        Fast-path inference on a raw 1-D feature vector already ordered as
+        self.feature_columns. Pure NumPy standardize + sigmoid using the
+        parameters cached at train time — no sklearn dispatch at all.
+        """
+        if not self.is_trained:
+            raise ValueError("Model not trained yet")
+
+        z = (feature_vector - self._mean) / self._scale
+        logit = z @ self._coef + self._intercept
+        return float(1.0 / (1.0 + np.exp(-logit)))
+
+    def predict_from_feature_row(self, full_row: np.ndarray) -> float:
+        """
+        Inference straight from a full feature-frame row (all columns, in
+        frame order). Selects the model's columns via the positional index
+        cached at train time, so no per-predict column lookup is needed.
+        """
+        if not self.is_trained:
+            raise ValueError("Model not trained yet")
+
+        # Mixed-dtype frames hand us an object array; make it float once here
+        row = np.asarray(full_row, dtype=float)
+        if _score_adherence is not None:
+            return float(_score_adherence(
+                row, self.col_idx, self._mean, self._scale,
+                self._coef, self._intercept
+            ))
+        return self.predict_next_day_proba_vector(row[self.col_idx])
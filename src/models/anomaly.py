@@ -1,8 +1,11 @@
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
+import numpy as np
 import pandas as pd
 from sklearn.ensemble import IsolationForest
 from sklearn.preprocessing import StandardScaler
 
+from src.models.scaling import registry as scaler_registry
+
 class AnomalyDetector:
     """
     Detects behavioral anomalies (Drift / Relapse Triggers).
@@ -17,6 +20,7 @@ class AnomalyDetector:
         self.scaler = StandardScaler()
         self.feature_cols = ['total_steps', 'sleep_duration_minutes', 'sleep_variance_7d']
         self.is_trained = False
+        self._col_idx = None
         
     def train(self, df: pd.DataFrame) -> Dict[str, Any]:
         """
@@ -30,16 +34,42 @@ class AnomalyDetector:
         
         self.model.fit(X_scaled)
         self.is_trained = True
+
+        # Publish stats to the shared registry and keep a contiguous
+        # (mean, scale) block so single-row checks are pure NumPy math.
+        scaler_registry.update(self.feature_cols, self.scaler.mean_, self.scaler.scale_)
+        stats = scaler_registry.block(self.feature_cols)
+        self._mean = stats[0]
+        self._scale = stats[1]
+        self._col_idx = np.array([df.columns.get_loc(c) for c in self.feature_cols])
         
-        # Count anomalies in training set
-        preds = self.model.predict(X_scaled)
-        n_anomalies = list(preds).count(-1)
+        # Count anomalies in training set: predict() is just
+        # decision_function < 0, so score once and threshold.
+        scores = self.model.decision_function(X_scaled)
+        n_anomalies = int((scores < 0).sum())
         
         return {
             "status": "success",
             "anomalies_detected_history": n_anomalies
         }
         
+    def check_anomalies_batch(self, df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Scores many days with one sklearn dispatch instead of a per-row loop.
+        Returns:
+            is_anomaly: bool array
+            severity: float array (lower is more anomalous)
+        """
+        if not self.is_trained:
+            n = len(df)
+            return np.zeros(n, dtype=bool), np.zeros(n)
+
+        # One forest traversal: predict() internally recomputes
+        # decision_function and thresholds it, so score once and compare.
+        X_scaled = self.scaler.transform(df[self.feature_cols])
+        scores = self.model.decision_function(X_scaled)
+        return scores < 0, scores
+
     def check_anomaly(self, day_row: pd.Series) -> Dict[str, Any]:
         """
         Checks if a specific day is an outlier.
@@ -50,14 +80,23 @@ class AnomalyDetector:
         if not self.is_trained:
              return {"is_anomaly": False, "score": 0.0}
              
-        # Extract features
+        # Extract features into a local 1xF row and scale in place. The row
+        # must be per-call: concurrent /predict handlers share this detector,
+        # and a shared scratch buffer races (the allocation is trivial next
+        # to the forest traversal). Full-row inputs (same column order as the
+        # training frame) are sliced by cached position; anything else by name.
         try:
-            X = pd.DataFrame([day_row[self.feature_cols]])
-            X_scaled = self.scaler.transform(X)
-            
-            # Predict
-            pred = self.model.predict(X_scaled)[0] # 1 for normal, -1 for outlier
-            score = self.model.decision_function(X_scaled)[0] 
+            X_scaled = np.empty((1, len(self.feature_cols)), dtype=np.float64)
+            if isinstance(day_row, pd.Series) and len(day_row) > len(self.feature_cols):
+                X_scaled[0] = day_row.to_numpy()[self._col_idx]
+            else:
+                X_scaled[0] = [day_row[c] for c in self.feature_cols]
+            X_scaled -= self._mean
+            X_scaled /= self._scale
+
+            # Single traversal: score < 0 is exactly predict() == -1
+            score = self.model.decision_function(X_scaled)[0]
+            pred = -1 if score < 0 else 1
             
             result = {
                 "is_anomaly": bool(pred == -1),
@@ -68,8 +107,7 @@ class AnomalyDetector:
             if result["is_anomaly"]:
                 # Explainability: Which feature deviated the most?
                 # X_scaled contains z-scores relative to training mean
-                import numpy as np
-                z_scores = X_scaled[0] 
+                z_scores = X_scaled[0]
                 max_idx = np.argmax(np.abs(z_scores))
                 feature_key = self.feature_cols[max_idx]
                 z_val = z_scores[max_idx]
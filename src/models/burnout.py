@@ -16,132 +16,127 @@ class BurnoutRiskModel:
         self.dropout_threshold = dropout_threshold_days
         self.cph = CoxPHFitter()
         self.is_trained = False
-        
-    def _identify_streaks(self, df: pd.DataFrame) -> pd.DataFrame:
-        """
-        Converts daily time-series into 'SURVIVAL FORMAT' (duration, event_occurred).
-        Returns a DataFrame where each row is a 'period' of consistent behavior 
-        leading up to a dropout (or current day).
-        """
-        data = df.copy().sort_index()
-        
-        # Define a 'Miss'
-        # If exercise_done is False, it's a miss.
-        # But we only care about BLOCKS of misses.
-        
-        data['is_miss'] = (data['exercise_done'] == False).astype(int)
-        
-        # Identify streaks of misses
-        # Group consecutive days with same 'is_miss' value
-        data['block_id'] = (data['is_miss'] != data['is_miss'].shift()).cumsum()
-        
-        # We want to identify 'Active Episodes'.
-        # An active episode ends when a 'Death Block' (Miss block >= threshold) starts.
-        
-        episodes = []
-        
-        # Simple approach for feature generation: 
-        # Break history into weekly chunks or just use sliding window "risk checks"?
-        # Standard Survival: One row per "subject". Here "subject" = A Habit Streak.
-        
-        # Let's iterate and find start/end of active streaks.
-        current_streak_start = data.index[0]
-        consecutive_misses = 0
-        
-        # We need to aggregate features for the streak
-        # For simplicity in this v1: We will compute instantaneous risk based on rolling features
-        # rather than full episode aggregation, as we assume time-varying covariates.
-        
-        # ALTERNATIVE: Rolling Hazard Prediction
-        # If we lack "multiple subjects", fitting CoxPH is hard.
-        # Let's pivot: We will treat every DAY as an observation, 
-        # and predicted variable is "Will dropout occur within K days?"
-        # But User asked for Survival Analysis.
-        
-        # Let's try to frame "Weekly Summaries" as subjects.
-        # Too complex for quick demo.
-        
-        pass 
+
+        # Fitted linear predictor cached at train time: partial hazard is
+        # just exp(beta . (x - norm_mean)), no pandas needed per predict.
+        self._beta = None
+        self._norm_mean = None
+        self._feature_order = None
         
     def prepare_data(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Prepares standard format for Lifelines: T (duration), E (event), covariates.
         Since we are single-user, we treat 'Past Streaks' as the population.
+
+        Death blocks and per-life covariate means are computed on plain
+        arrays (run-length boundaries + prefix sums), so only the short
+        walk over the K dropout events stays in Python.
         """
-        # 1. Detect Missed Blocks
         df = df.sort_index()
-        df['miss_groups'] = (df['exercise_done'] != df['exercise_done'].shift()).cumsum()
-        
-        # Filter to miss blocks
-        miss_blocks = df[df['exercise_done'] == False].groupby('miss_groups')
-        
-        # Find dates where a "Dropout" (Death) actually happened
-        dropout_dates = []
-        for _, group in miss_blocks:
-            if len(group) >= self.dropout_threshold:
-                # The start of this block is the "Death" date
-                dropout_dates.append(group.index[0])
-                
-        # Now segment the entire history into "Lives" (periods between dropouts)
-        # Start -> Dropout 1 -> Dropout 2 -> Current (Censored)
-        
+        n = len(df)
+        if n == 0:
+            return pd.DataFrame()
+
+        idx = df.index
+        miss = (~df['exercise_done'].astype(bool)).to_numpy()
+
+        # 1. Run-length blocks: a death is a miss block >= threshold long.
+        #    Block boundaries come from one diff over the miss mask.
+        change = np.flatnonzero(miss[1:] != miss[:-1]) + 1
+        block_starts = np.concatenate(([0], change))
+        block_ends = np.concatenate((change, [n]))  # exclusive
+        is_death = miss[block_starts] & ((block_ends - block_starts) >= self.dropout_threshold)
+        death_positions = block_starts[is_death]
+
+        # Positions of exercise days, for "restart at next success" lookups
+        ex_positions = np.flatnonzero(~miss)
+
+        # 2. Prefix sums: any period mean becomes O(1)
+        def prefix(col):
+            return np.concatenate(([0.0], np.cumsum(df[col].to_numpy(dtype=float))))
+
+        csum = {
+            'avg_sleep_consistency': prefix('sleep_consistency_score'),
+            'avg_effort_ratio': prefix('effort_ratio'),
+            'avg_sleep_var': prefix('sleep_variance_7d'),
+        }
+        ex_minutes = df['exercise_minutes'].to_numpy(dtype=float)
+
+        def aggregate(start_pos, end_pos, event):
+            """Positional equivalent of _aggregate_period (inclusive slice)."""
+            m = end_pos - start_pos + 1
+            if m < 3:
+                return None  # Too short to meaningful
+            life = {
+                'duration': (idx[end_pos] - idx[start_pos]).days,
+                'event': event,
+            }
+            for key, c in csum.items():
+                life[key] = (c[end_pos + 1] - c[start_pos]) / m
+            life['initial_motivation'] = ex_minutes[start_pos:start_pos + 3].mean()
+            return life
+
+        # 3. Segment history into "Lives" (periods between dropouts)
+        #    Start -> Dropout 1 -> Dropout 2 -> Current (Censored)
         lives = []
-        current_start = df.index[0]
-        
-        dates_of_interest = sorted(dropout_dates)
-        
+        current = 0
+
         # If no dropouts ever, entire history is one censored life
-        if not dates_of_interest:
-             # Aggregate whole history
-             life_attrs = self._aggregate_period(df, current_start, df.index[-1], event=0)
-             if life_attrs: lives.append(life_attrs)
+        if death_positions.size == 0:
+            life_attrs = aggregate(0, n - 1, event=0)
+            if life_attrs: lives.append(life_attrs)
         else:
-            for death_date in dates_of_interest:
-                if death_date > current_start:
-                    # History from current_start to death_date is a "Life" that DIED (Event=1)
-                    # We usually say time is (death_date - start)
-                    # Exclude the death block itself from the "Active behavior" aggregation statistics?
-                    # Maybe include last 7 days of it to capture the decline.
-                    
-                    life_attrs = self._aggregate_period(df, current_start, death_date, event=1)
+            for death_pos in death_positions:
+                if death_pos > current:
+                    # Life from current to the death date DIED (Event=1)
+                    life_attrs = aggregate(current, death_pos, event=1)
                     if life_attrs: lives.append(life_attrs)
-                    
-                    # New life starts after the death event?
-                    # Or does it start immediately? A dropout implies a restart.
-                    # Let's assume restart happens when they exercise again.
-                    
-                    # Find next exercise date
-                    future = df[df.index > death_date]
-                    next_success = future[future['exercise_done'] == True].first_valid_index()
-                    
-                    if next_success:
-                        current_start = next_success
+
+                    # A dropout implies a restart when they exercise again
+                    j = np.searchsorted(ex_positions, death_pos + 1)
+                    if j < ex_positions.size:
+                        current = ex_positions[j]
                     else:
-                        current_start = None
+                        current = None
                         break
-            
+
             # Remaining time is censored
-            if current_start and current_start <= df.index[-1]:
-                life_attrs = self._aggregate_period(df, current_start, df.index[-1], event=0)
+            if current is not None and current <= n - 1:
+                life_attrs = aggregate(current, n - 1, event=0)
                 if life_attrs: lives.append(life_attrs)
-                
-        return pd.DataFrame(lives)
 
-    def _aggregate_period(self, df: pd.DataFrame, start, end, event):
-        """Aggregate behavioral stats for a specific time window (A 'Life')."""
-        subset = df.loc[start:end]
+        # Hand lifelines one contiguous float64 block: CoxPHFitter calls
+        # .values on the frame anyway, so pre-typing the matrix avoids its
+        # per-column dtype inference and defensive copy.
+        if not lives:
+            return pd.DataFrame()
+        cols = ['duration', 'event', 'avg_sleep_consistency',
+                'avg_effort_ratio', 'avg_sleep_var', 'initial_motivation']
+        X = np.array([[life[c] for c in cols] for life in lives],
+                     dtype=np.float64, order='C')
+        return pd.DataFrame(X, columns=cols)
+
+    def _aggregate_period(self, df: pd.DataFrame, start_pos: int, end_pos: int, event):
+        """
+        Aggregate behavioral stats for a specific time window (A 'Life').
+        Takes integer positions (inclusive) into a date-sorted frame: iloc
+        views plus raw-array means, no label-based index search or copy.
+        (prepare_data uses its own prefix-sum equivalent for bulk runs.)
+        """
+        subset = df.iloc[start_pos:end_pos + 1]
         if len(subset) < 3: return None # Too short to meaningful
-        
-        duration = (end - start).days
-        
+
+        idx_ns = df.index.asi8
+        duration = int((idx_ns[end_pos] - idx_ns[start_pos]) // 86_400_000_000_000)
+
         # Covariates: Mean/Variance of behavior during this attempt
         return {
             'duration': duration,
             'event': event, # 1 if died, 0 if still going
-            'avg_sleep_consistency': subset['sleep_consistency_score'].mean(),
-            'avg_effort_ratio': subset['effort_ratio'].mean(),
-            'avg_sleep_var': subset['sleep_variance_7d'].mean(),
-            'initial_motivation': subset.iloc[:3]['exercise_minutes'].mean() # First 3 days effort
+            'avg_sleep_consistency': subset['sleep_consistency_score'].values.mean(),
+            'avg_effort_ratio': subset['effort_ratio'].values.mean(),
+            'avg_sleep_var': subset['sleep_variance_7d'].values.mean(),
+            'initial_motivation': subset['exercise_minutes'].values[:3].mean() # First 3 days effort
         }
 
     def train(self, df: pd.DataFrame) -> Dict[str, Any]:
@@ -158,7 +153,11 @@ class BurnoutRiskModel:
             # Fit Model
             self.cph.fit(survival_df, duration_col='duration', event_col='event')
             self.is_trained = True
-            
+
+            self._feature_order = list(self.cph.params_.index)
+            self._beta = self.cph.params_.to_numpy()
+            self._norm_mean = self.cph._norm_mean.reindex(self._feature_order).to_numpy()
+
             return {
                 "status": "success",
                 "concordance": self.cph.concordance_index_,
@@ -174,9 +173,16 @@ class BurnoutRiskModel:
         """
         if not self.is_trained:
             return 0.5 # Default risk
-            
-        # Create a single-row DF
+
+        if self._beta is not None:
+            # exp(beta . (x - norm_mean)) — what predict_partial_hazard
+            # computes, minus the one-row DataFrame and column realigning
+            x = np.fromiter(
+                (recent_streak_features.get(k, 0.0) for k in self._feature_order),
+                dtype=np.float64, count=len(self._feature_order)
+            )
+            return float(np.exp((x - self._norm_mean) @ self._beta))
+
+        # Fallback: single-row DF through lifelines
         df = pd.DataFrame([recent_streak_features])
-        
-        # Get partial hazard (relative risk)
         return self.cph.predict_partial_hazard(df).iloc[0]
@@ -0,0 +1,30 @@
+from typing import Dict, List
+import numpy as np
+
+class ScalerRegistry:
+    """
+    Shared store of fitted standardization stats, keyed by feature name.
+    Models publish their StandardScaler (mean, scale) pairs here at train
+    time; at inference each model slices one contiguous (2, F) block for
+    its own column order, so scoring a row is plain array arithmetic with
+    no per-call DataFrame or sklearn transform.
+    """
+
+    def __init__(self):
+        self.means: Dict[str, float] = {}
+        self.scales: Dict[str, float] = {}
+
+    def update(self, columns: List[str], means, scales) -> None:
+        for c, m, s in zip(columns, means, scales):
+            self.means[c] = float(m)
+            self.scales[c] = float(s)
+
+    def block(self, columns: List[str]) -> np.ndarray:
+        """Contiguous (2, F) array: row 0 = means, row 1 = scales."""
+        block = np.empty((2, len(columns)))
+        block[0] = [self.means[c] for c in columns]
+        block[1] = [self.scales[c] for c in columns]
+        return block
+
+# Process-wide registry shared by the models
+registry = ScalerRegistry()
@@ -5,25 +5,26 @@ import numpy as np
 
 from src.domain.schemas import RawHealthEvent, DailyBehavior, EventType
 
+_ETYPE_CODE = {EventType.STEPS: 0, EventType.EXERCISE: 1, EventType.SLEEP: 2}
+_EPOCH_ORDINAL = 719_163  # date(1970, 1, 1).toordinal()
+
 class DailyAggregator:
     def __init__(self):
         pass
 
-    def aggregate(self, events: List[RawHealthEvent]) -> List[DailyBehavior]:
+    def _bucket_by_day(self, events: List[RawHealthEvent]):
         """
-        Converts a stream of raw events into DailyBehavior rows.
+        Group raw events by "Reporting Date" for the behavior.
+        Strategy:
+        - Steps/Exercise: Assigned to the calendar date of the start_time (local)
+        - Sleep: Assigned to the date of the *end_time* (The "Wake Up" day)
         """
-        # Group by "Reporting Date" for the behavior
-        # Strategy:
-        # - Steps/Exercise: Assigned to the calendar date of the start_time (local)
-        # - Sleep: Assigned to the date of the *end_time* (The "Wake Up" day)
-        
         day_buckets = defaultdict(lambda: {
             "steps": [],
             "exercise": [],
             "sleep": []
         })
-        
+
         for e in events:
             if e.event_type == EventType.SLEEP:
                 # Assign to wake-up day
@@ -37,56 +38,173 @@ class DailyAggregator:
                 elif e.event_type == EventType.EXERCISE:
                     day_buckets[bucket_date]["exercise"].append(e)
 
-        results = []
-        
-        # Sort dates to ensure order
+        return day_buckets
+
+    def aggregate(self, events: List[RawHealthEvent]) -> List[DailyBehavior]:
+        """
+        Converts a stream of raw events into DailyBehavior rows.
+
+        One Python pass extracts parallel arrays (day, type, value, times);
+        all per-day reductions then run as grouped array ops — bincount for
+        the sums, a sorted group-scan for the main sleep, a scatter-min for
+        the first exercise time — instead of defaultdict-of-lists buckets.
+        """
+        n = len(events)
+        if n == 0:
+            return []
+
+        # Wearable streams are often 100% step events; detect that with one
+        # attribute-only pass and skip the exercise/sleep machinery (and the
+        # per-event datetime conversions) entirely.
+        if {e.event_type for e in events} == {EventType.STEPS}:
+            starts = np.array([e.start_time for e in events], dtype='datetime64[us]')
+            bucket = starts.astype('datetime64[D]').astype(np.int64) + _EPOCH_ORDINAL
+            value = np.fromiter((e.value for e in events), dtype=np.float64, count=n)
+            days = np.unique(bucket)
+            di = np.searchsorted(days, bucket)
+            total_steps = np.bincount(di, weights=value, minlength=days.size)
+            return [
+                DailyBehavior(
+                    date=date.fromordinal(int(day)),
+                    total_steps=int(st),
+                    exercise_minutes=0.0,
+                    exercise_done=False,
+                    exercise_start_time=None,
+                    sleep_start_time=None,
+                    sleep_end_time=None,
+                    sleep_duration_minutes=0.0,
+                    sedentary_minutes=1440.0,
+                    data_missing_flag=bool(st == 0)
+                )
+                for day, st in zip(days, total_steps)
+            ]
+
+        # Harvest flat arrays once; day-bucketing is then a datetime64[D]
+        # floor (a C integer divide) instead of a .date() object per event.
+        etype = np.fromiter(     # 0=steps, 1=exercise, 2=sleep, -1=other
+            (_ETYPE_CODE.get(e.event_type, -1) for e in events),
+            dtype=np.int8, count=n
+        )
+        value = np.fromiter((e.value for e in events), dtype=np.float64, count=n)
+        starts = np.array([e.start_time for e in events], dtype='datetime64[us]')
+        ends = np.array([e.end_time for e in events], dtype='datetime64[us]')
+        # Steps/exercise bucket on the start day; sleep on the wake-up day
+        day = np.where(etype == 2, ends, starts).astype('datetime64[D]')
+        bucket = day.astype(np.int64) + _EPOCH_ORDINAL
+
+        known = etype >= 0
+        days = np.unique(bucket[known])
+        nd = days.size
+
+        total_steps = np.zeros(nd, dtype=np.float64)
+        ex_minutes = np.zeros(nd, dtype=np.float64)
+        sleep_dur = np.zeros(nd, dtype=np.float64)
+        sleep_sel = np.full(nd, -1, dtype=np.int64)   # event index of main sleep
+        _INT_NAT = np.iinfo(np.int64).max
+        ex_first = np.full(nd, _INT_NAT, dtype=np.int64)
+
+        # --- STEPS: per-day sum ---
+        m = etype == 0
+        if m.any():
+            di = np.searchsorted(days, bucket[m])
+            total_steps = np.bincount(di, weights=value[m], minlength=nd)
+
+        # --- EXERCISE: per-day sum + earliest start ---
+        m = etype == 1
+        if m.any():
+            di = np.searchsorted(days, bucket[m])
+            ex_minutes = np.bincount(di, weights=value[m], minlength=nd)
+            np.minimum.at(ex_first, di, starts[m].astype(np.int64))
+
+        # --- SLEEP: main sleep is the longest one if multiple ---
+        m = etype == 2
+        if m.any():
+            sleep_idx = np.flatnonzero(m)
+            # Sort by (day, -value); the first row of each day group is the
+            # first occurrence of the max, matching max(..., key=value).
+            order = np.lexsort((-value[sleep_idx], bucket[sleep_idx]))
+            b_sorted = bucket[sleep_idx][order]
+            firsts = np.concatenate(([True], b_sorted[1:] != b_sorted[:-1]))
+            chosen = sleep_idx[order[firsts]]
+            di = np.searchsorted(days, b_sorted[firsts])
+            sleep_sel[di] = chosen
+            sleep_dur[di] = value[chosen]
+
+        # --- DERIVED ---
+        # Sedentary Proxy: 1440 mins - sleep - exercise = Awake Sedentary Potential.
+        sedentary = np.maximum(0.0, (1440 - sleep_dur) - ex_minutes)
+        data_missing = (total_steps == 0) & (sleep_dur == 0)
+
+        starts_dt = starts.tolist()  # python datetimes, indexed by event
+        ends_dt = ends.tolist()
+
+        return [
+            DailyBehavior(
+                date=date.fromordinal(int(day)),
+                total_steps=int(st),
+                exercise_minutes=float(em),
+                exercise_done=bool(em > 0),
+                exercise_start_time=(
+                    np.int64(ef).astype('datetime64[us]').tolist()
+                    if ef != _INT_NAT else None
+                ),
+                sleep_start_time=starts_dt[sl] if sl >= 0 else None,
+                sleep_end_time=ends_dt[sl] if sl >= 0 else None,
+                sleep_duration_minutes=float(sd),
+                sedentary_minutes=float(sed),
+                data_missing_flag=bool(dm)
+            )
+            for day, st, em, ef, sl, sd, sed, dm in zip(
+                days, total_steps, ex_minutes, ex_first, sleep_sel,
+                sleep_dur, sedentary, data_missing
+            )
+        ]
+
+    def aggregate_to_arrays(self, events: List[RawHealthEvent]) -> Dict[str, np.ndarray]:
+        """
+        SoA variant of aggregate: same day-bucketing, but fills preallocated
+        column arrays directly. For consumers that only want a DataFrame
+        (e.g. a display table), this skips building a DailyBehavior object
+        per day entirely.
+        """
+        day_buckets = self._bucket_by_day(events)
         sorted_dates = sorted(day_buckets.keys())
-        
-        for d in sorted_dates:
+        n = len(sorted_dates)
+
+        total_steps = np.zeros(n, dtype=np.int64)
+        exercise_minutes = np.zeros(n, dtype=np.float64)
+        exercise_done = np.zeros(n, dtype=bool)
+        sleep_duration = np.zeros(n, dtype=np.float64)
+        data_missing = np.zeros(n, dtype=bool)
+
+        for i, d in enumerate(sorted_dates):
             data = day_buckets[d]
-            
-            # --- STEPS ---
-            total_steps = sum(int(s.value) for s in data["steps"])
-            
-            # --- EXERCISE ---
-            ex_events = data["exercise"]
-            ex_minutes = sum(float(x.value) for x in ex_events)
-            is_exercise_done = ex_minutes > 15 # Threshold for "Active" flag? Or just > 0. Let's start with > 0.
-            # Actually prompt said 0/1, let's strictly say > 0 implies 1.
-            # Also finding first exercise time
-            first_ex_time = min((x.start_time for x in ex_events), default=None)
-            
-            # --- SLEEP ---
+
+            steps = sum(int(s.value) for s in data["steps"])
+            ex_minutes = sum(float(x.value) for x in data["exercise"])
+
+            # Main sleep = longest; one numpy pass instead of a per-event
+            # key-lambda through max().
             sleep_events = data["sleep"]
-            # Assuming main sleep is the longest one if multiple
-            main_sleep = max(sleep_events, key=lambda x: x.value) if sleep_events else None
-            
-            sleep_start = main_sleep.start_time if main_sleep else None
-            sleep_end = main_sleep.end_time if main_sleep else None
-            sleep_dur = main_sleep.value if main_sleep else 0.0
-            
-            # --- DERIVED ---
-            # Sedentary Proxy: (Minutes in Day - Sleep - Exercise) / (Steps / Constant) ? 
-            # Simple version: Inverse of activity. 
-            # 1440 mins - sleep - exercise = Awake Sedentary Potential.
-            # If steps are low, high sedentary.
-            # Let's just calculate "Wake time not moving" logic roughly if we had full timeline.
-            # For now, just placeholder or simple formula.
-            awake_time = 1440 - sleep_dur
-            sedentary_calc = awake_time - ex_minutes # Very rough
-            
-            daily = DailyBehavior(
-                date=d,
-                total_steps=total_steps,
-                exercise_minutes=ex_minutes,
-                exercise_done=bool(ex_minutes > 0),
-                exercise_start_time=first_ex_time,
-                sleep_start_time=sleep_start,
-                sleep_end_time=sleep_end,
-                sleep_duration_minutes=sleep_dur,
-                sedentary_minutes=max(0.0, sedentary_calc),
-                data_missing_flag=(total_steps == 0 and sleep_dur == 0)
-            )
-            results.append(daily)
-            
-        return results
+            if sleep_events:
+                sleep_dur = float(np.fromiter(
+                    (x.value for x in sleep_events),
+                    dtype=np.float64, count=len(sleep_events)
+                ).max())
+            else:
+                sleep_dur = 0.0
+
+            total_steps[i] = steps
+            exercise_minutes[i] = ex_minutes
+            exercise_done[i] = ex_minutes > 0
+            sleep_duration[i] = sleep_dur
+            data_missing[i] = (steps == 0 and sleep_dur == 0)
+
+        return {
+            'date': np.array(sorted_dates, dtype=object),
+            'total_steps': total_steps,
+            'exercise_minutes': exercise_minutes,
+            'exercise_done': exercise_done,
+            'sleep_duration_minutes': sleep_duration,
+            'data_missing_flag': data_missing,
+        }
@@ -3,44 +3,225 @@ import numpy as np
 from typing import List
 from src.domain.schemas import DailyBehavior
 
+# Optional: pandas can JIT-compile its rolling reductions when numba is
+# installed (pays off on long histories); otherwise fall back to cython.
+try:
+    from numba import njit
+    _ROLLING_KW = {'engine': 'numba', 'engine_kwargs': {'nopython': True, 'nogil': True}}
+except ImportError:
+    njit = None
+    _ROLLING_KW = {}
+
+# Optional: bottleneck's move_mean/move_std run one C sweep per stat over a
+# raw array, several times faster than pandas .rolling dispatch.
+try:
+    import bottleneck as bn
+except ImportError:
+    bn = None
+
+def _miss_counters(miss, miss_or_gap):
+    """
+    One pass over the miss masks producing both streak counters:
+    consecutive_misses (run length with reset) and rolling_misses_3d
+    (3-day sliding sum, zero for the first two rows like fillna(0) after
+    a min_periods=3 rolling sum). NumPy fallback; jitted below if numba
+    is available.
+    """
+    c = np.cumsum(miss)
+    consec = c - np.maximum.accumulate(np.where(miss, 0, c))
+    roll3 = np.convolve(miss_or_gap, np.ones(3), mode='full')[:miss.size]
+    roll3[:2] = 0.0
+    return consec, roll3
+
+if njit is not None:
+    @njit(cache=True)
+    def _miss_counters(miss, miss_or_gap):  # noqa: F811 - jitted variant
+        n = miss.size
+        consec = np.zeros(n, np.int64)
+        roll3 = np.zeros(n, np.float64)
+        run = 0
+        for i in range(n):
+            run = run + 1 if miss[i] else 0
+            consec[i] = run
+            if i >= 2:
+                roll3[i] = miss_or_gap[i] + miss_or_gap[i - 1] + miss_or_gap[i - 2]
+        return consec, roll3
+
+    _miss_counters(np.zeros(3, dtype=np.bool_), np.zeros(3, dtype=np.bool_))
+
+def _rolling_std(x, w, min_count):
+    """
+    O(N) rolling sample std (ddof=1) via running sum / sum-of-squares,
+    matching rolling(w, min_periods=min_count).std() but without the
+    per-step window recompute. NumPy fallback uses prefix sums; jitted
+    below to a true streaming update if numba is available.
+    """
+    n = x.size
+    x = x.astype(np.float64, copy=False)  # float64 accumulators for x**2 sums
+    c = np.concatenate(([0.0], np.cumsum(x)))
+    c2 = np.concatenate(([0.0], np.cumsum(x * x)))
+    counts = np.minimum(np.arange(1, n + 1), w)
+    starts = np.arange(1, n + 1) - counts
+    s = c[1:] - c[starts]
+    ss = c2[1:] - c2[starts]
+    var = (ss - s * s / counts) / np.maximum(counts - 1, 1)
+    out = np.sqrt(np.maximum(var, 0.0))
+    out[counts < min_count] = np.nan
+    return out
+
+if njit is not None:
+    @njit(cache=True)
+    def _rolling_std(x, w, min_count):  # noqa: F811 - jitted variant
+        n = x.size
+        out = np.empty(n)
+        s = 0.0
+        ss = 0.0
+        for i in range(n):
+            xi = x[i]
+            s += xi
+            ss += xi * xi
+            if i >= w:
+                xo = x[i - w]
+                s -= xo
+                ss -= xo * xo
+            cnt = i + 1 if i < w else w
+            if cnt < min_count:
+                out[i] = np.nan
+            else:
+                var = (ss - s * s / cnt) / (cnt - 1)
+                out[i] = np.sqrt(var) if var > 0.0 else 0.0
+        return out
+
+    _rolling_std(np.zeros(4), 3, 3)
+
+def records_to_frame(records: List[DailyBehavior]) -> pd.DataFrame:
+    """
+    Build a DataFrame from DailyBehavior records column-wise (SoA).
+    np.fromiter with a known dtype/count allocates each column once,
+    skipping the per-record model_dump dicts and pandas dtype inference.
+    """
+    n = len(records)
+    if n == 0:
+        return pd.DataFrame()
+    return pd.DataFrame({
+        'date': np.fromiter((r.date for r in records), dtype=object, count=n),
+        'total_steps': np.fromiter((r.total_steps for r in records), dtype=np.int32, count=n),
+        'exercise_minutes': np.fromiter((r.exercise_minutes for r in records), dtype=np.float64, count=n),
+        'exercise_done': np.fromiter((r.exercise_done for r in records), dtype=bool, count=n),
+        'sleep_duration_minutes': np.fromiter((r.sleep_duration_minutes for r in records), dtype=np.float64, count=n),
+        'data_missing_flag': np.fromiter((r.data_missing_flag for r in records), dtype=bool, count=n),
+    })
+
+def extend_miss_run(df: pd.DataFrame, carry: int) -> None:
+    """
+    Fix up the run-length counters on a frame enhanced from a trailing
+    slice of history. The rolling features only need MAX_WINDOW of context,
+    but consecutive_misses looks back arbitrarily far: rows whose miss run
+    reaches the start of the slice get `carry` (the counter value of the
+    row just before the slice) added in place, and the derived streak flags
+    are rebuilt to match.
+    """
+    if carry <= 0:
+        return
+    consec = df['consecutive_misses'].to_numpy()
+    # A run that includes row 0 shows up as consec[i] == i + 1
+    from_start = consec == np.arange(1, consec.size + 1, dtype=consec.dtype)
+    if not from_start.any():
+        return
+    consec = consec + np.where(from_start, np.int16(carry), np.int16(0))
+    df['consecutive_misses'] = consec
+    df['is_recovery_period'] = ((consec > 0) & (consec < 3)).view(np.int8)
+    break_mask = consec > 4
+    df['is_streak_break'] = break_mask.view(np.int8)
+    df['days_since_workout'] = np.where(break_mask, consec, np.int16(0))
+
+
 class FeatureEngineer:
     """
     Transforms canonical daily data into ML-ready feature vectors.
     Focuses on behavioral signals (consistency, trends) rather than just raw totals.
     """
-    
-    def __init__(self):
-        pass
+
+    # Largest rolling window used below (steps_30d_avg). Callers scoring a
+    # single new day only need this much trailing context, not the full history.
+    MAX_WINDOW = 30
+
+    # Columns that can come out of enhance() with NaNs: shift(1) lags and
+    # rolling stats with min_periods > 1, plus their derived ratios.
+    NAN_COLS = (
+        'prev_steps', 'prev_sleep_dur', 'prev_exercise_done',
+        'sleep_variance_7d', 'steps_variance_7d', 'sleep_consistency_score',
+        'steps_30d_avg', 'effort_ratio',
+    )
+
+    def __init__(self, engine: str = "pandas"):
+        # "polars" is an opt-in alternative backend: same feature set, but the
+        # rolling aggregations are planned lazily and run multithreaded.
+        # Requires the optional polars package.
+        if engine not in ("pandas", "polars"):
+            raise ValueError(f"Unknown feature engine: {engine}")
+        self.engine = engine
 
     def enhance(self, daily_data: List[DailyBehavior]) -> pd.DataFrame:
         """
-        Takes a list of DailyBehavior objects and returns a DataFrame 
+        Takes a list of DailyBehavior objects and returns a DataFrame
         enriched with rolling features, lag features, and behavioral signals.
         """
-        # Convert to DataFrame
-        df = pd.DataFrame([d.model_dump() for d in daily_data])
-        
+        # Convert to DataFrame column-wise (SoA): one typed array per input
+        # signal instead of a model_dump dict per record. Nothing downstream
+        # reads the optional passthrough fields, so they stay off the frame.
+        df = records_to_frame(daily_data)
+
         if df.empty:
             return df
-            
+
         df['date'] = pd.to_datetime(df['date'])
-        df = df.sort_values('date').set_index('date')
-        
+        # Aggregator/simulation output is already chronological; only pay
+        # for a sort when it isn't.
+        if not df['date'].is_monotonic_increasing:
+            df = df.sort_values('date')
+
+        if self.engine == "polars":
+            return self._enhance_polars(df)
+
+        df = df.set_index('date')
+
         # 1. Basic Shift/Lag Features (What happened yesterday matters for today)
-        df['prev_steps'] = df['total_steps'].shift(1)
-        df['prev_sleep_dur'] = df['sleep_duration_minutes'].shift(1)
-        df['prev_exercise_done'] = df['exercise_done'].shift(1).astype(float)
+        # Lag-1 on a positional frame is just a slice copy with a leading
+        # NaN; no need for Series.shift's realignment machinery.
+        def _lag1(arr):
+            prev = np.empty(len(arr), dtype=np.float32)
+            prev[0] = np.nan
+            prev[1:] = arr[:-1]
+            return prev
+
+        df['prev_steps'] = _lag1(df['total_steps'].to_numpy())
+        df['prev_sleep_dur'] = _lag1(df['sleep_duration_minutes'].to_numpy())
+        df['prev_exercise_done'] = _lag1(df['exercise_done'].to_numpy())
         
         # 2. Rolling Trends (7-day windows)
-        # 7d mean
-        df['steps_7d_avg'] = df['total_steps'].rolling(window=7, min_periods=1).mean()
-        df['sleep_7d_avg'] = df['sleep_duration_minutes'].rolling(window=7, min_periods=1).mean()
-        
         # 3. Behavioral Consistency (Variance)
         # ADHD/Burnout signal: High sleep variance often precedes burnout/drop-off.
-        df['sleep_variance_7d'] = df['sleep_duration_minutes'].rolling(window=7, min_periods=3).std()
-        df['steps_variance_7d'] = df['total_steps'].rolling(window=7, min_periods=3).std()
-        
+        # Extract the two source arrays once; with bottleneck each stat is a
+        # single fused sweep instead of a pandas rolling dispatch.
+        # float32 throughout: plenty of precision for behavioral averages
+        # and halves memory bandwidth for every downstream consumer.
+        steps = df['total_steps'].to_numpy(dtype=np.float32)
+        sleep = df['sleep_duration_minutes'].to_numpy(dtype=np.float32)
+        # bottleneck rejects windows longer than the array, so short frames
+        # stay on the pandas path (which pads with partial windows).
+        use_bn = bn is not None and len(df) >= self.MAX_WINDOW
+        if use_bn:
+            df['steps_7d_avg'] = bn.move_mean(steps, 7, min_count=1)
+            df['sleep_7d_avg'] = bn.move_mean(sleep, 7, min_count=1)
+            df['sleep_variance_7d'] = bn.move_std(sleep, 7, min_count=3, ddof=1)
+            df['steps_variance_7d'] = bn.move_std(steps, 7, min_count=3, ddof=1)
+        else:
+            df['steps_7d_avg'] = df['total_steps'].rolling(window=7, min_periods=1).mean(**_ROLLING_KW)
+            df['sleep_7d_avg'] = df['sleep_duration_minutes'].rolling(window=7, min_periods=1).mean(**_ROLLING_KW)
+            df['sleep_variance_7d'] = _rolling_std(sleep, 7, 3)
+            df['steps_variance_7d'] = _rolling_std(steps, 7, 3)
+
         # 4. "Consistency Score" (Inverse of Coefficient of Variation)
         # Higher is better. If mean is 0, handle gracefully.
         # CV = StdDev / Mean. Score = 1 / (1 + CV) to bound it roughly 0-1
@@ -48,42 +229,125 @@ class FeatureEngineer:
         epsilon = 1e-6
         df['sleep_consistency_score'] = 1 / (1 + (df['sleep_variance_7d'] / (df['sleep_7d_avg'] + epsilon)))
         
-        # 5. Recovery / Resilience Signal
-        # Did they bounce back? 
-        # Feature: logic check if 2 days ago was a miss (0 steps/exercise) and yesterday was a hit.
-        # Simplification: Rolling sum of "misses" in last 3 days
-        df['rolling_misses_3d'] = (df['data_missing_flag'] | (df['exercise_done'] == False)).rolling(window=3).sum()
-
-        # Custom Logic: "Streak Break" vs "Recovery"
-        # Calculate consecutive days without exercise (0 or False)
-        # We invert boolean to count 'misses'
-        is_miss = (~df['exercise_done']).astype(int)
-        # Group by change in value, then cumsum to get run lengths of 1s (misses)
-        # 1. Detect changes: is_miss != shift
-        # 2. Cumsum identifies groups
-        # 3. Cumsum of values within groups gives counter
-        group_id = (is_miss != is_miss.shift()).cumsum()
-        df['consecutive_misses'] = is_miss.groupby(group_id).cumsum()
-        
+        # 5. Recovery / Resilience Signal + "Streak Break" counters
+        # Both miss-streak features come from one fused pass over the masks:
+        # a rolling 3-day miss sum and a run-length counter with reset
+        # (replaces the groupby(group_id).cumsum() dance, which degenerates
+        # to ~N groups of size 1 on alternating days).
+        miss = (~df['exercise_done']).to_numpy(dtype=np.bool_)
+        miss_or_gap = df['data_missing_flag'].to_numpy(dtype=np.bool_) | miss
+        consec, roll3 = _miss_counters(miss, miss_or_gap)
+        df['rolling_misses_3d'] = roll3
+        # Narrow integer types: miss streaks fit comfortably in int16 and
+        # the flags are 0/1, so the masks blend in 1-2 bytes per element.
+        cm = consec.astype(np.int16)
+        df['consecutive_misses'] = cm
+
         # User Rule: < 3 days miss -> Recovery (Bonus)
         # User Rule: > 4 days miss -> Break (Penalty)
-        df['is_recovery_period'] = ((df['consecutive_misses'] > 0) & (df['consecutive_misses'] < 3)).astype(int)
-        df['is_streak_break'] = (df['consecutive_misses'] > 4).astype(int)
+        df['is_recovery_period'] = ((cm > 0) & (cm < 3)).view(np.int8)
+        break_mask = cm > 4
+        df['is_streak_break'] = break_mask.view(np.int8)
         # We also pass the raw count for the break to indicate magnitude (14 days worse than 5)
-        df['days_since_workout'] = df['consecutive_misses'] * df['is_streak_break']
+        df['days_since_workout'] = np.where(break_mask, cm, np.int16(0))
 
         # 6. Temporal Context
-        df['day_of_week'] = df.index.dayofweek # 0=Mon, 6=Sun
-        df['is_weekend'] = df['day_of_week'].isin([5, 6]).astype(int)
+        # Weekday straight from the int64 nanosecond index: epoch day 0
+        # (1970-01-01) was a Thursday (Mon=0 -> 3), hence the +3. Two vector
+        # ops instead of the dayofweek accessor plus an isin hash probe.
+        dow = ((df.index.asi8 // 86_400_000_000_000 + 3) % 7).astype(np.int8)
+        df['day_of_week'] = dow # 0=Mon, 6=Sun
+        df['is_weekend'] = (dow >= 5).astype(np.int8)
         
         # 7. Intensity/Load Features
         # "Effort Overload": Recent activity significantly higher than monthly baseline
-        df['steps_30d_avg'] = df['total_steps'].rolling(window=30, min_periods=7).mean()
-        df['effort_ratio'] = df['steps_7d_avg'] / (df['steps_30d_avg'] + epsilon)
+        if use_bn:
+            df['steps_30d_avg'] = bn.move_mean(steps, 30, min_count=7)
+        else:
+            df['steps_30d_avg'] = df['total_steps'].rolling(window=30, min_periods=7).mean(**_ROLLING_KW)
+        avg7 = df['steps_7d_avg'].to_numpy()
+        avg30 = df['steps_30d_avg'].to_numpy()
+        ratio = np.divide(avg7, avg30 + np.float32(epsilon), out=np.empty_like(avg7))
+        df['effort_ratio'] = ratio
         # If effort ratio > 1.3, they might be pushing too hard (Burnout risk)
+        # — surfaced directly as a flag while the ratio array is still hot.
+        df['effort_overload'] = (ratio > 1.3).astype(np.int8)
         
+        # Columns that went through pandas (shifts, fallback rolling) come
+        # back float64; fold them down to float32 with the rest.
+        for c in df.columns:
+            if df[c].dtype == np.float64:
+                df[c] = df[c].astype(np.float32)
+
         # Drop initial rows where lags create NaNs (optional, or handle in model)
-        # For this phase, we keep them but fillna(0) for simple models might be needed
-        df = df.fillna(0)
-        
+        # For this phase, we keep them but zero-fill for simple models.
+        # Only the lag/min_periods columns can hold NaN, so fill those
+        # in place instead of scanning every cell with a frame-wide fillna.
+        for c in self.NAN_COLS:
+            arr = df[c].to_numpy()
+            np.nan_to_num(arr, copy=False, nan=0.0)
+            df[c] = arr
+
         return df
+
+    def _enhance_polars(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Lazy Polars version of the feature pipeline. All rolling expressions
+        are declared up front so the query planner can fuse them into one
+        multithreaded pass; output matches the pandas path (date-indexed).
+        """
+        import polars as pl  # deferred: only needed when engine="polars"
+
+        epsilon = 1e-6
+        is_miss = (~pl.col('exercise_done')).cast(pl.Int64)
+
+        # Only the numeric inputs go through polars; object-dtype passthrough
+        # columns (optional timestamps etc.) are joined back at the end.
+        inputs = df[['date', 'total_steps', 'exercise_minutes',
+                     'sleep_duration_minutes', 'exercise_done', 'data_missing_flag']]
+
+        lf = pl.from_pandas(inputs).lazy().with_columns(
+            pl.col('total_steps').shift(1).alias('prev_steps'),
+            pl.col('sleep_duration_minutes').shift(1).alias('prev_sleep_dur'),
+            pl.col('exercise_done').shift(1).cast(pl.Float64).alias('prev_exercise_done'),
+            pl.col('total_steps').rolling_mean(window_size=7, min_samples=1).alias('steps_7d_avg'),
+            pl.col('sleep_duration_minutes').rolling_mean(window_size=7, min_samples=1).alias('sleep_7d_avg'),
+            pl.col('sleep_duration_minutes').rolling_std(window_size=7, min_samples=3).alias('sleep_variance_7d'),
+            pl.col('total_steps').rolling_std(window_size=7, min_samples=3).alias('steps_variance_7d'),
+            (pl.col('data_missing_flag') | ~pl.col('exercise_done'))
+                .cast(pl.Int64).rolling_sum(window_size=3).alias('rolling_misses_3d'),
+            pl.col('total_steps').rolling_mean(window_size=30, min_samples=7).alias('steps_30d_avg'),
+            # Run-length groups of misses (fill_null so the first row starts a group)
+            (is_miss != is_miss.shift(1).fill_null(-1)).cum_sum().alias('_miss_group'),
+            (pl.col('date').dt.weekday() - 1).alias('day_of_week'),  # 0=Mon, 6=Sun
+        ).with_columns(
+            (1 / (1 + pl.col('sleep_variance_7d') / (pl.col('sleep_7d_avg') + epsilon)))
+                .alias('sleep_consistency_score'),
+            (pl.col('steps_7d_avg') / (pl.col('steps_30d_avg') + epsilon)).alias('effort_ratio'),
+            is_miss.cum_sum().over('_miss_group').alias('consecutive_misses'),
+            (pl.col('day_of_week') >= 5).cast(pl.Int64).alias('is_weekend'),
+        ).with_columns(
+            ((pl.col('consecutive_misses') > 0) & (pl.col('consecutive_misses') < 3))
+                .cast(pl.Int64).alias('is_recovery_period'),
+            (pl.col('consecutive_misses') > 4).cast(pl.Int64).alias('is_streak_break'),
+        ).with_columns(
+            (pl.col('consecutive_misses') * pl.col('is_streak_break')).alias('days_since_workout'),
+            (pl.col('effort_ratio') > 1.3).cast(pl.Int64).alias('effort_overload'),
+        ).drop('_miss_group')
+
+        collected = lf.collect()
+        # Column-wise numpy export (avoids the pyarrow dependency of to_pandas)
+        feats = pd.DataFrame(
+            {c: collected[c].to_numpy() for c in collected.columns}
+        ).set_index('date')
+        # Keep the same column order the pandas path produces
+        feature_order = [
+            'prev_steps', 'prev_sleep_dur', 'prev_exercise_done',
+            'steps_7d_avg', 'sleep_7d_avg', 'sleep_variance_7d', 'steps_variance_7d',
+            'sleep_consistency_score', 'rolling_misses_3d', 'consecutive_misses',
+            'is_recovery_period', 'is_streak_break', 'days_since_workout',
+            'day_of_week', 'is_weekend', 'steps_30d_avg', 'effort_ratio',
+            'effort_overload',
+        ]
+        out = df.set_index('date').join(feats[feature_order])
+        return out.fillna(0)
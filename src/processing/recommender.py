@@ -1,99 +1,138 @@
-from typing import List, Dict, Any
+from typing import Any, Dict, List
+import numpy as np
 from src.domain.api_schemas import EngineResponse, RecommendationType
 
+# LOGIC HIERARCHY (Safety First), precompiled as template tables. Bucket
+# order: 0 sleep-deprived, 1 anomaly, 2 burnout, 3 low adherence (short
+# absence), 4 low adherence (long absence), 5 borderline, 6 stable, 7 high.
+_TEMPLATES = (
+    (RecommendationType.RECOVERY, "Sleep First, Train Later",
+     "You got less than 5 hours of sleep. Training now is counter-productive and dangerous.",
+     "Skip the workout. Go get a nap or go to bed early tonight."),
+    (RecommendationType.RECOVERY, "Check-in time",
+     "We noticed some unusual patterns today. Everything okay?",
+     "Log a quick mood check-in instead of a workout."),
+    (RecommendationType.SCALE_DOWN, "Protect your energy",
+     "Your stats suggest you're pushing hard. Let's avoid burnout.",
+     "Do 50% of your planned duration today."),
+    (RecommendationType.ANCHORING, "Don't break the chain",
+     "You missed a few days, but it happens. The key is to get back to it immediately to keep your habit strong.",
+     "Start small: Just do 5 minutes of movement to break the seal."),
+    (RecommendationType.ANCHORING, "Everything okay?",
+     "We noticed you've been away for a bit. Don't worry—failures are just data points on the road to success. We can get back on the wagon today.",
+     "Start small: Just do 5 minutes of movement to break the seal."),
+    (RecommendationType.MAINTAIN, "Time to Shift Gears",
+     "You've missed a few days, but momentum is waiting for you. Try pushing a little harder today to get back on track.",
+     "Commit to your standard session today—you can do this."),
+    (RecommendationType.MAINTAIN, "Good Work",
+     "You are doing well! Hang in there and keep the momentum building.",
+     "Stick to the plan. Consistency is compounding."),
+    (RecommendationType.MAINTAIN, "Keep It Up!",
+     "Excellent dedication. You're consistently showing up and the results show.",
+     "Use this momentum to your advantage—great day for a PR or just enjoying the flow."),
+)
+
+# Explanations are format strings, rendered only when a single response is
+# actually built (the batch path skips them entirely).
+_REASONS = (
+    ("Severe sleep deprivation detected ({sleep_hours:.1f} hours).",
+     "Cognitive and physical recovery is severely compromised."),
+    ("Behavioral anomaly detected{context_str}.",),
+    ("High burnout risk score ({burnout_risk:.2f}).",
+     "Recent effort ratio is unsustainable."),
+    ("Low adherence probability ({adherence_prob:.1%}).",
+     "Focus is on re-establishing the habit loop, not intensity."),
+    ("Low adherence probability ({adherence_prob:.1%}).",
+     "Focus is on re-establishing the habit loop, not intensity."),
+    ("Adherence probability is borderline ({adherence_prob:.1%}).",
+     "A strong session today will reverse the negative trend."),
+    ("Stable adherence probability ({adherence_prob:.1%}).",),
+    ("High adherence probability ({adherence_prob:.1%}).",),
+)
+
+_TYPES = np.array([t[0] for t in _TEMPLATES], dtype=object)
+_TITLES = np.array([t[1] for t in _TEMPLATES], dtype=object)
+_BODIES = np.array([t[2] for t in _TEMPLATES], dtype=object)
+_ACTIONS = np.array([t[3] for t in _TEMPLATES], dtype=object)
+
+
+def _classify(adherence_prob, burnout_risk, is_anomaly, sleep_minutes, consecutive_misses):
+    """
+    Branchless bucket index, scalar or array. Masks are applied lowest
+    priority first so the safety rules overwrite everything else.
+    """
+    adh = np.asarray(adherence_prob, dtype=float)
+    # 0: < 0.4, 1: 0.4-0.5, 2: 0.5-0.7 (inclusive), 3: > 0.7
+    adh_idx = (adh >= 0.4).astype(np.int8) + (adh >= 0.5) + (adh > 0.7)
+    low_bucket = np.where(np.asarray(consecutive_misses) <= 7, 3, 4)
+    bucket = np.where(adh_idx == 0, low_bucket, 4 + adh_idx)
+    bucket = np.where(np.asarray(burnout_risk, dtype=float) > 1.2, 2, bucket)
+    bucket = np.where(np.asarray(is_anomaly, dtype=bool), 1, bucket)
+    bucket = np.where(np.asarray(sleep_minutes, dtype=float) < 300, 0, bucket)
+    return bucket
+
+
 class RecommendationEngine:
     """
     Rule-based Logic Layer that translates ML signals into User Actions.
+    The decision tree lives in the module-level template tables; scoring is
+    a bucket lookup, so batches classify in one vectorized pass.
     """
-    
+
+    def generate_batch(
+        self,
+        adherence_prob: np.ndarray,
+        burnout_risk: np.ndarray,
+        is_anomaly: np.ndarray,
+        sleep_duration_minutes: np.ndarray,
+        consecutive_misses: np.ndarray,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Classify many days/users at once. Returns column arrays (SoA) of the
+        recommendation fields; explanations are omitted on this path.
+        """
+        bucket = _classify(
+            adherence_prob, burnout_risk, is_anomaly,
+            sleep_duration_minutes, consecutive_misses
+        )
+        return {
+            'bucket': bucket,
+            'recommendation_type': _TYPES[bucket],
+            'message_title': _TITLES[bucket],
+            'message_body': _BODIES[bucket],
+            'suggested_action': _ACTIONS[bucket],
+        }
+
     def generate_recommendation(
-        self, 
+        self,
         user_id: str,
         date_str: str,
-        adherence_prob: float, 
-        burnout_risk: float, 
+        adherence_prob: float,
+        burnout_risk: float,
         is_anomaly: bool,
         recent_features: Dict[str, Any],
         anomaly_context: str = None
     ) -> EngineResponse:
-        
-        reasons = []
-        rec_type = RecommendationType.MAINTAIN
-        title = "Keep it up!"
-        body = "You're on track."
-        action = "Complete your standard session."
 
-        # LOGIC HIERARCHY (Safety First)
-
-        # 0. SEVERE SLEEP DEPRIVATION (Hard Rule)
         # Check raw sleep minutes from the current day's feature row
         current_sleep = recent_features.get('sleep_duration_minutes', 480) # default 8h if missing
-        if current_sleep < 300: # Less than 5 hours
-            rec_type = RecommendationType.RECOVERY
-            title = "Sleep First, Train Later"
-            body = "You got less than 5 hours of sleep. Training now is counter-productive and dangerous."
-            action = "Skip the workout. Go get a nap or go to bed early tonight."
-            reasons.append(f"Severe sleep deprivation detected ({current_sleep/60:.1f} hours).")
-            reasons.append("Cognitive and physical recovery is severely compromised.")
-        
-        # 1. ANOMALY / ACUTE DISTRESS CHECK
-        elif is_anomaly:
-            rec_type = RecommendationType.RECOVERY
-            title = "Check-in time"
-            context_str = f" ({anomaly_context})" if anomaly_context else ""
-            body = f"We noticed some unusual patterns today. Everything okay?"
-            action = "Log a quick mood check-in instead of a workout."
-            reasons.append(f"Behavioral anomaly detected{context_str}.")
-
-        # 2. BURNOUT RISK CHECK (High Hazard Score)
-        elif burnout_risk > 1.2: # Threshold relative to baseline 1.0
-            rec_type = RecommendationType.SCALE_DOWN
-            title = "Protect your energy"
-            body = "Your stats suggest you're pushing hard. Let's avoid burnout."
-            action = "Do 50% of your planned duration today."
-            reasons.append(f"High burnout risk score ({burnout_risk:.2f}).")
-            reasons.append("Recent effort ratio is unsustainable.")
-
-        # 3. LOW ADHERENCE (< 40%) - Reassurance & Reset
-        elif adherence_prob < 0.4:
-            rec_type = RecommendationType.ANCHORING
-            missed_days = recent_features.get('consecutive_misses', 0)
-            
-            if missed_days <= 7:
-                title = "Don't break the chain"
-                body = "You missed a few days, but it happens. The key is to get back to it immediately to keep your habit strong."
-            else:
-                title = "Everything okay?"
-                body = "We noticed you've been away for a bit. Don't worry—failures are just data points on the road to success. We can get back on the wagon today."
-            
-            action = "Start small: Just do 5 minutes of movement to break the seal."
-            reasons.append(f"Low adherence probability ({adherence_prob:.1%}).")
-            reasons.append("Focus is on re-establishing the habit loop, not intensity.")
+        missed_days = recent_features.get('consecutive_misses', 0)
 
-        # 4. MODERATE-LOW ADHERENCE (40-50%) - Nudge to Push
-        elif adherence_prob < 0.5:
-            rec_type = RecommendationType.MAINTAIN
-            title = "Time to Shift Gears"
-            body = "You've missed a few days, but momentum is waiting for you. Try pushing a little harder today to get back on track."
-            action = "Commit to your standard session today—you can do this."
-            reasons.append(f"Adherence probability is borderline ({adherence_prob:.1%}).")
-            reasons.append("A strong session today will reverse the negative trend.")
+        bucket = int(_classify(
+            adherence_prob, burnout_risk, is_anomaly, current_sleep, missed_days
+        ))
 
-        # 5. MODERATE-HIGH ADHERENCE (50-70%) - Encouragement
-        elif adherence_prob <= 0.7:
-            rec_type = RecommendationType.MAINTAIN
-            title = "Good Work"
-            body = "You are doing well! Hang in there and keep the momentum building."
-            action = "Stick to the plan. Consistency is compounding."
-            reasons.append(f"Stable adherence probability ({adherence_prob:.1%}).")
-            
-        # 6. HIGH ADHERENCE (> 70%) - Praise
-        else:
-            rec_type = RecommendationType.MAINTAIN
-            title = "Keep It Up!"
-            body = "Excellent dedication. You're consistently showing up and the results show."
-            action = "Use this momentum to your advantage—great day for a PR or just enjoying the flow."
-            reasons.append(f"High adherence probability ({adherence_prob:.1%}).")
+        rec_type, title, body, action = _TEMPLATES[bucket]
+        context_str = f" ({anomaly_context})" if anomaly_context else ""
+        reasons = [
+            r.format(
+                sleep_hours=current_sleep / 60,
+                context_str=context_str,
+                burnout_risk=burnout_risk,
+                adherence_prob=adherence_prob,
+            )
+            for r in _REASONS[bucket]
+        ]
 
         return EngineResponse(
             user_id=user_id,